@@ -0,0 +1,227 @@
+import io
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import platform
+import contextlib
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+# End-to-end ETL benchmark on synthetic data (see generate_data.py): times
+# load_csv, prepare_data and DatabaseLoader.load_data per load mode, then
+# every validator and report, and appends one JSON line per stage with
+# rows/sec and peak memory to the results file so runs can be compared.
+# Each load mode starts from freshly created tables, by default in a
+# local SQLite file, so no SQL Server is needed.
+
+ROOT = Path(__file__).resolve().parent.parent
+for folder in ('', 'etl-pipeline', 'data-validation', 'output-scripts'):
+    sys.path.append(str(ROOT / folder))
+
+from generate_data import OUTPUT_DIR, generate, parse_rows
+
+RESULTS_FILE = ROOT / 'benchmarks' / 'results' / 'etl.jsonl'
+SQLITE_PATH = OUTPUT_DIR / 'bench.db'
+
+# stage: (module, function)
+VALIDATORS = {
+    'validate_record_count': ('validate_recordCount', 'validate_recordCount'),
+    'validate_completeness': ('validate_completness', 'validate_completeness'),
+    'validate_risk_distribution': ('validate_riskDistribution', 'validate_riskDistribution'),
+    'validate_geo_distribution': ('validate_geoDistribution', 'validate_geoDistribution'),
+    'validate_audit_trail': ('validate_auditTrailVerification', 'validate_auditTrailVerification'),
+    'validate_all': ('validate_all', 'validate_all'),
+}
+
+
+def _reset_peak_memory():
+    # Linux resets VmHWM to the current RSS; elsewhere the peak is not recorded
+    try:
+        Path('/proc/self/clear_refs').write_text('5')
+    except OSError:
+        pass
+
+
+def _memory_mb(field):
+    try:
+        for line in Path('/proc/self/status').read_text().splitlines():
+            if line.startswith(f"{field}:"):
+                return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def measure(stage, rows, function, **info):
+    from connection_manager import clear_query_cache
+
+    # Cached query results would turn every repeat into a dictionary lookup
+    clear_query_cache()
+    _reset_peak_memory()
+    rss_before = _memory_mb('VmRSS')
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        value = function()
+        seconds = time.perf_counter() - start
+    peak = _memory_mb('VmHWM')
+    record = {
+        'stage': stage,
+        'rows': rows,
+        'seconds': round(seconds, 4),
+        'rows_per_sec': round(rows / seconds) if rows and seconds else None,
+        'peak_rss_mb': peak,
+        'peak_delta_mb': round(peak - rss_before, 1) if peak is not None and rss_before is not None else None,
+        **info,
+    }
+    print(f"  {stage:<32}{record['seconds']:>10.3f}s{record['rows_per_sec'] or '':>12}"
+          f"{peak if peak is not None else '':>10}")
+    return value, record
+
+
+# --indexes: orchestration.py flags for each index set
+INDEX_SETS = {'managed': [], 'base': ['--skip-indexes'], 'columnstore': ['--columnstore']}
+
+
+def setup_tables(indexes='managed'):
+    result = subprocess.run([sys.executable, str(ROOT / 'database-setup' / 'orchestration.py'), *INDEX_SETS[indexes]],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"database setup failed:\n{result.stdout}{result.stderr}")
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def bench_load(files, mode, chunk_size):
+    from etl_pipe import BULK_CHUNK_SIZE, DatabaseLoader, load_csv, prepare_data
+    from connection_manager import get_connection_string
+
+    records = []
+    for kind, info in files.items():
+        df, record = measure('load_csv', info['rows'], lambda: load_csv(info['path']), file=kind)
+        records.append(record)
+        df, record = measure('prepare_data', info['rows'], lambda: prepare_data(df), file=kind)
+        records.append(record)
+        loader = DatabaseLoader(get_connection_string(), chunk_size=chunk_size or BULK_CHUNK_SIZE)
+        results, record = measure(f"load_data_{mode}", info['rows'], lambda: loader.load_data(df, mode=mode),
+                                  file=kind, mode=mode)
+        record.update({key: results[key] for key in ('successful_inserts', 'successful_updates',
+                                                     'unchanged_records', 'collapsed_records', 'failed_records')})
+        records.append(record)
+        if results['errors'] and results['errors'][-1].startswith('error: '):
+            raise RuntimeError(f"{mode} load of {info['path']} failed: {results['errors'][-1]}")
+    return records
+
+
+def bench_queries(rows):
+    import importlib
+    from main import REPORTS, generate_all_reports, load_reports
+
+    records = []
+    for stage, (module_name, function_name) in VALIDATORS.items():
+        function = getattr(importlib.import_module(module_name), function_name)
+        records.append(measure(stage, rows, function)[1])
+    reports = load_reports(REPORTS)
+    for name, (_, generate_report, _) in reports.items():
+        records.append(measure(f"report_{name}", rows, generate_report)[1])
+    records.append(measure('report_all_parallel', rows, lambda: generate_all_reports(reports))[1])
+    return records
+
+
+def check_mssql_database(name):
+    from connection_manager import get_database_name
+
+    if not name:
+        return "--backend mssql needs --mssql-database, a database the benchmark may drop tables in"
+    if name.lower() == get_database_name().lower():
+        return f"refusing to benchmark in {name}, the configured DB_NAME; its tables would be dropped"
+    return None
+
+
+def run(sizes, modes, results_file, backend='sqlite', sqlite_path=SQLITE_PATH, chunk_size=None,
+        update_rows=None, indexes='managed', mssql_database=None, **options):
+    # update_rows defaults to 10% of each size. Every load mode drops and
+    # recreates the tables, so SQL Server runs need a database of their own.
+    if backend == 'sqlite':
+        os.environ['DB_BACKEND'] = 'sqlite'
+        os.environ['SQLITE_PATH'] = str(sqlite_path)
+        Path(sqlite_path).parent.mkdir(parents=True, exist_ok=True)
+    else:
+        problem = check_mssql_database(mssql_database)
+        if problem:
+            raise ValueError(problem)
+        os.environ['DB_BACKEND'] = 'mssql'
+        os.environ['DB_NAME'] = mssql_database
+    run_info = {
+        'run_id': str(uuid.uuid4()),
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': _git_revision(),
+        'backend': backend,
+        'database': mssql_database if backend == 'mssql' else str(sqlite_path),
+        'indexes': indexes,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+    }
+    results_file = Path(results_file)
+    results_file.parent.mkdir(parents=True, exist_ok=True)
+    records = []
+
+    for rows in sizes:
+        print(f"\n{rows} rows: generating data")
+        files = generate(rows, update_rows=rows // 10 if update_rows is None else update_rows, **options)
+        print(f"  {'stage':<32}{'seconds':>11}{'rows/sec':>12}{'peak MB':>10}")
+        for mode in modes:
+            setup_tables(indexes)
+            records.extend({**run_info, 'size': rows, **record} for record in bench_load(files, mode, chunk_size))
+        # Validators and reports read the tables the last load mode left behind
+        from connection_manager import run_query
+        table_rows = run_query("SELECT COUNT(*) FROM customer_enriched")[0][0]
+        records.extend({**run_info, 'size': rows, **record} for record in bench_queries(table_rows))
+
+        with open(results_file, 'a') as f:
+            for record in records:
+                f.write(json.dumps(record, default=str) + '\n')
+        records = []
+    print(f"\nResults appended to {results_file}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark load, validation and reports on synthetic data')
+    parser.add_argument('sizes', nargs='*', default=['10k'], help='rows per run, e.g. 10k 1M 10M (default: 10k)')
+    parser.add_argument('--modes', nargs='+', default=['bulk', 'merge'], help='load modes (default: bulk merge)')
+    parser.add_argument('--backend', choices=['sqlite', 'mssql'], default='sqlite',
+                        help='sqlite uses --sqlite-path; mssql uses --mssql-database on the configured server')
+    parser.add_argument('--sqlite-path', default=str(SQLITE_PATH))
+    parser.add_argument('--mssql-database',
+                        help='SQL Server database to create and drop tables in, must differ from DB_NAME')
+    parser.add_argument('--indexes', choices=list(INDEX_SETS), default='managed',
+                        help='managed index set, base (tables only) or columnstore (mssql only)')
+    parser.add_argument('--chunksize', type=int, help='rows per bulk chunk (default: loader default)')
+    parser.add_argument('--results', default=str(RESULTS_FILE), help='JSON lines file the results are appended to')
+    parser.add_argument('--update-rows', help='rows in the updates file (default: 10%% of the size)')
+    parser.add_argument('--update-overlap', type=float, default=0.5)
+    parser.add_argument('--duplicate-rate', type=float, default=0.0)
+    parser.add_argument('--region-skew', type=float, default=1.0)
+    parser.add_argument('--null-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    if args.backend == 'mssql' and check_mssql_database(args.mssql_database):
+        parser.error(check_mssql_database(args.mssql_database))
+
+    run(
+        [parse_rows(size) for size in args.sizes], args.modes, args.results, args.backend,
+        args.sqlite_path, args.chunksize,
+        update_rows=parse_rows(args.update_rows) if args.update_rows else None, indexes=args.indexes,
+        mssql_database=args.mssql_database,
+        update_overlap=args.update_overlap, duplicate_rate=args.duplicate_rate,
+        region_skew=args.region_skew, null_rate=args.null_rate, seed=args.seed,
+    )
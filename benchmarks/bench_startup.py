@@ -0,0 +1,88 @@
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+# Startup cost of main.py per command, measured with python -X importtime.
+# Commands that never touch the database should not load any of HEAVY_MODULES.
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ('pandas', 'numpy', 'sqlalchemy', 'pyodbc')
+
+COMMANDS = {
+    'import main': ['-c', 'import main'],
+    'main.py --help': ['main.py', '--help'],
+    'main.py report --help': ['main.py', 'report', '--help'],
+    'main.py load --help': ['main.py', 'load', '--help'],
+    'main.py validate --file': ['main.py', 'validate', '--file', 'data/new_users.csv'],
+}
+
+
+def parse_importtime(stderr):
+    # Lines look like "import time:   self |   cumulative | <indent>module";
+    # top level imports have no indent, so their cumulative times add up
+    # to the whole import cost of the process
+    modules = {}
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative_us, name = line.split(':', 1)[1].split('|')
+        cumulative_us = int(cumulative_us)
+        modules[name.strip()] = cumulative_us
+        if name[1:2] != ' ':
+            total += cumulative_us
+    return total, modules
+
+
+def run_once(args):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', *args],
+                            cwd=ROOT, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    total, modules = parse_importtime(result.stderr)
+    heavy = sorted(name for name in modules if name.split('.')[0] in HEAVY_MODULES and '.' not in name)
+    return {'wall_ms': wall * 1000, 'import_ms': total / 1000, 'heavy_modules': heavy, 'modules': modules}
+
+
+def bench(repeat, top):
+    results = []
+    for label, args in COMMANDS.items():
+        runs = [run_once(args) for _ in range(repeat)]
+        slowest = sorted(runs[-1]['modules'].items(), key=lambda item: item[1], reverse=True)
+        results.append({
+            'command': label,
+            'wall_ms': round(statistics.median(run['wall_ms'] for run in runs), 1),
+            'import_ms': round(statistics.median(run['import_ms'] for run in runs), 1),
+            'heavy_modules': runs[-1]['heavy_modules'],
+            'slowest_imports': [(name, round(us / 1000, 1)) for name, us in slowest[:top]],
+        })
+    return results
+
+
+def print_results(results):
+    print(f"{'command':<28}{'wall ms':>10}{'import ms':>12}  heavy modules")
+    for result in results:
+        heavy = ', '.join(result['heavy_modules']) or '-'
+        print(f"{result['command']:<28}{result['wall_ms']:>10}{result['import_ms']:>12}  {heavy}")
+    for result in results:
+        print(f"\nSlowest imports for {result['command']}:")
+        for name, ms in result['slowest_imports']:
+            print(f"  {ms:>8} ms  {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark main.py startup time per command')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per command, the median is reported')
+    parser.add_argument('--top', type=int, default=5, help='slowest imports to list per command')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    results = bench(args.repeat, args.top)
+    print_results(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
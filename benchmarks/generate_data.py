@@ -0,0 +1,223 @@
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Synthetic customer files in the same shape as data/new_users.csv, for
+# load and report benchmarks. Rows are generated and written in blocks so
+# 10M-row files need no more memory than 10k-row ones.
+
+ROOT = Path(__file__).resolve().parent.parent
+OUTPUT_DIR = ROOT / 'benchmarks' / 'data'
+BLOCK_ROWS = 250000
+FIRST_ID = 1000001
+
+CSV_COLUMNS = [
+    'customer_id', 'first_name', 'last_name', 'email', 'phone', 'postcode',
+    'region', 'country', 'district', 'longitude', 'latitude', 'geo_enriched',
+    'company', 'company_size', 'industry', 'annual_revenue', 'is_business',
+    'calculated_risk', 'risk_score_numeric', 'risk_factors',
+    'status', 'processed_date', 'data_source', 'enrichment_status'
+]
+# Columns that --null-rate blanks; the NOT NULL columns are left alone
+NULLABLE_COLUMNS = ['phone', 'postcode', 'district', 'company', 'industry', 'annual_revenue', 'risk_factors']
+
+# region: (country, districts, postcode prefix, longitude, latitude)
+REGIONS = {
+    'London': ('England', ['Westminster', 'Tower Hamlets', 'City of London', 'Camden', 'Hackney'], 'E', -0.12, 51.51),
+    'South East': ('England', ['Brighton', 'Reading', 'Oxford', 'Canterbury'], 'BN', -1.0, 51.3),
+    'North West': ('England', ['Manchester', 'Liverpool', 'Preston', 'Bolton'], 'M', -2.24, 53.48),
+    'West Midlands': ('England', ['Birmingham', 'Coventry', 'Wolverhampton'], 'B', -1.89, 52.48),
+    'Yorkshire and The Humber': ('England', ['Leeds', 'Sheffield', 'York', 'Hull'], 'LS', -1.55, 53.8),
+    'East of England': ('England', ['Cambridge', 'Norwich', 'Ipswich'], 'CB', 0.12, 52.2),
+    'South West': ('England', ['Bristol', 'Exeter', 'Plymouth', 'Bath'], 'BS', -2.59, 51.45),
+    'East Midlands': ('England', ['Nottingham', 'Leicester', 'Derby'], 'NG', -1.15, 52.95),
+    'North East': ('England', ['Newcastle', 'Sunderland', 'Durham'], 'NE', -1.61, 54.97),
+    'Scotland': ('Scotland', ['Glasgow', 'Edinburgh', 'Aberdeen', 'Dundee'], 'G', -4.25, 55.86),
+    'Wales': ('Wales', ['Cardiff', 'Swansea', 'Newport'], 'CF', -3.18, 51.48),
+    'Northern Ireland': ('Northern Ireland', ['Belfast', 'Derry', 'Lisburn'], 'BT', -5.93, 54.6),
+}
+FIRST_NAMES = ['John', 'Jane', 'Mike', 'Sarah', 'Bob', 'Alice', 'David', 'Emma', 'James', 'Olivia',
+               'Liam', 'Sophie', 'Noah', 'Amelia', 'Harry', 'Isla', 'Jack', 'Grace', 'Oscar', 'Mia']
+LAST_NAMES = ['Smith', 'Doe', 'Johnson', 'Wilson', 'Brown', 'Cooper', 'Taylor', 'Watson', 'Jones',
+              'Williams', 'Davies', 'Evans', 'Thomas', 'Roberts', 'Walker', 'Wright', 'Hall', 'Green']
+COMPANY_WORDS = ['Tech', 'Retail', 'Design', 'Solutions', 'Innovation', 'Green', 'Northern', 'Atlas', 'Bright']
+# size: (revenue band, weight)
+COMPANY_SIZES = {
+    'Micro (1-10 employees)': ('£0-£100K', 0.45),
+    'Small (10-50 employees)': ('£100K-£2M', 0.3),
+    'Medium (50-250 employees)': ('£2M-£10M', 0.17),
+    'Large (250+ employees)': ('£10M+', 0.08),
+}
+INDUSTRIES = ['Technology', 'Retail', 'Creative Services', 'Finance', 'Healthcare', 'Manufacturing', 'Hospitality']
+HIGH_RISK_REGIONS = ('London', 'West Midlands', 'Yorkshire and The Humber')
+
+
+def parse_rows(value):
+    # 10k, 1M, 10M or a plain number
+    multipliers = {'k': 1000, 'm': 1000000}
+    suffix = value[-1].lower()
+    if suffix in multipliers:
+        return int(float(value[:-1]) * multipliers[suffix])
+    return int(value)
+
+
+def _pick(rng, values, size, weights=None):
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=size, p=weights)]
+
+
+def region_weights(skew):
+    # Zipf-like: skew 0 is uniform, larger values concentrate rows in the first regions
+    ranks = np.arange(1, len(REGIONS) + 1, dtype=float)
+    weights = ranks ** -skew
+    return weights / weights.sum()
+
+
+def generate_block(rng, ids, region_skew=1.0, null_rate=0.0, processed_date='2025-10-02 12:49:23',
+                   data_source='Synthetic'):
+    size = len(ids)
+    names = list(REGIONS)
+    region = _pick(rng, names, size, region_weights(region_skew))
+    region_index = pd.Index(names).get_indexer(region)
+    country = np.array([REGIONS[name][0] for name in names], dtype=object)[region_index]
+    district = np.empty(size, dtype=object)
+    for index, name in enumerate(names):
+        in_region = region_index == index
+        district[in_region] = _pick(rng, REGIONS[name][1], int(in_region.sum()))
+    prefix = np.array([REGIONS[name][2] for name in names], dtype=object)[region_index]
+    base_longitude = np.array([REGIONS[name][3] for name in names])[region_index]
+    base_latitude = np.array([REGIONS[name][4] for name in names])[region_index]
+
+    first_name = _pick(rng, FIRST_NAMES, size)
+    last_name = _pick(rng, LAST_NAMES, size)
+    customer_id = np.asarray(ids)
+    email = pd.Series(first_name).str.lower() + '.' + pd.Series(last_name).str.lower() \
+        + pd.Series(customer_id).astype(str) + '@example.com'
+
+    is_business = rng.random(size) < 0.35
+    sizes = list(COMPANY_SIZES)
+    size_weights = np.array([COMPANY_SIZES[name][1] for name in sizes])
+    company_size = np.where(is_business, _pick(rng, sizes, size, size_weights / size_weights.sum()), 'Individual')
+    revenue = pd.Series(company_size).map({name: band for name, (band, _) in COMPANY_SIZES.items()}).fillna('N/A')
+    industry = np.where(is_business, _pick(rng, INDUSTRIES, size), 'Personal')
+    company = np.where(
+        is_business,
+        _pick(rng, COMPANY_WORDS, size) + ' ' + _pick(rng, COMPANY_WORDS, size) + ' Ltd',
+        None
+    )
+
+    suspended = rng.random(size) < 0.03
+    risky_region = np.isin(region, HIGH_RISK_REGIONS) & (rng.random(size) < 0.4)
+    small_business = is_business & (company_size == sizes[0])
+    score = 2 * risky_region + small_business + 3 * suspended
+    calculated_risk = np.select([score >= 3, score >= 1], ['High', 'Medium'], 'Low')
+    factors = pd.Series(np.where(suspended, 'Account suspended; ', '')) \
+        + np.where(risky_region, 'High-risk region; ', '') + np.where(small_business, 'Small business; ', '')
+    risk_factors = factors.str.rstrip('; ').replace('', 'Standard profile')
+
+    df = pd.DataFrame({
+        'customer_id': customer_id,
+        'first_name': first_name,
+        'last_name': last_name,
+        'email': email,
+        'phone': pd.Series(rng.integers(1000000000, 1999999999, size)).astype(str).radd('0'),
+        'postcode': prefix + pd.Series(rng.integers(1, 30, size)).astype(str) + ' '
+                    + pd.Series(rng.integers(1, 9, size)).astype(str) + 'AA',
+        'region': region,
+        'country': country,
+        'district': district,
+        'longitude': (base_longitude + rng.normal(0, 0.05, size)).round(4),
+        'latitude': (base_latitude + rng.normal(0, 0.05, size)).round(4),
+        'geo_enriched': 1,
+        'company': company,
+        'company_size': company_size,
+        'industry': industry,
+        'annual_revenue': revenue,
+        'is_business': is_business.astype(int),
+        'calculated_risk': calculated_risk,
+        'risk_score_numeric': score,
+        'risk_factors': risk_factors,
+        'status': np.where(suspended, 'suspended', 'active'),
+        'processed_date': processed_date,
+        'data_source': data_source,
+        'enrichment_status': 'Fully Enriched',
+    }, columns=CSV_COLUMNS)
+
+    if null_rate:
+        for column in NULLABLE_COLUMNS:
+            df[column] = df[column].mask(rng.random(size) < null_rate)
+    return df
+
+
+def _with_duplicates(rng, ids, duplicate_rate):
+    # Repeats duplicate_rate of the keys at random positions in the block, as a resend would
+    if not duplicate_rate:
+        return ids
+    repeats = rng.choice(ids, size=int(len(ids) * duplicate_rate), replace=False)
+    mixed = np.concatenate([ids, repeats])
+    return mixed[np.argsort(np.concatenate([np.arange(len(ids)), rng.integers(0, len(ids), len(repeats))]),
+                            kind='stable')]
+
+
+def write_file(path, ids, seed, region_skew=1.0, null_rate=0.0, duplicate_rate=0.0, data_source='Synthetic'):
+    # ids is the full key sequence of the file, written BLOCK_ROWS at a time
+    rng = np.random.default_rng(seed)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rows = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for start in range(0, len(ids), BLOCK_ROWS):
+            block = _with_duplicates(rng, ids[start:start + BLOCK_ROWS], duplicate_rate)
+            df = generate_block(rng, block, region_skew, null_rate, data_source=data_source)
+            df.to_csv(f, header=start == 0, index=False, lineterminator='\n')
+            rows += len(df)
+    return rows
+
+
+def generate(rows, output_dir=OUTPUT_DIR, update_rows=0, update_overlap=0.5, duplicate_rate=0.0,
+             region_skew=1.0, null_rate=0.0, seed=42):
+    # Writes customers_<rows>.csv and, with update_rows, customers_<rows>_updates.csv
+    # where update_overlap of the rows change existing customers and the rest are new
+    output_dir = Path(output_dir)
+    options = dict(region_skew=region_skew, null_rate=null_rate, duplicate_rate=duplicate_rate)
+    base_ids = np.arange(FIRST_ID, FIRST_ID + rows)
+    base_path = output_dir / f"customers_{rows}.csv"
+    written = write_file(base_path, base_ids, seed, **options)
+    files = {'base': {'path': str(base_path), 'rows': written}}
+
+    if update_rows:
+        rng = np.random.default_rng(seed + 1)
+        overlap = min(int(update_rows * update_overlap), rows)
+        existing = rng.choice(base_ids, size=overlap, replace=False)
+        new = np.arange(FIRST_ID + rows, FIRST_ID + rows + update_rows - overlap)
+        update_ids = np.concatenate([existing, new])
+        rng.shuffle(update_ids)
+        update_path = output_dir / f"customers_{rows}_updates.csv"
+        # A different seed changes the generated fields of the overlapping customers
+        written = write_file(update_path, update_ids, seed + 2, data_source='Synthetic_Update', **options)
+        files['updates'] = {'path': str(update_path), 'rows': written, 'overlap': overlap}
+    return files
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate synthetic customer CSVs for benchmarks')
+    parser.add_argument('rows', nargs='+', help='rows per file, e.g. 10k 1M 10M')
+    parser.add_argument('--output-dir', default=str(OUTPUT_DIR))
+    parser.add_argument('--update-rows', default='0', help='rows in the matching updates file (default: none)')
+    parser.add_argument('--update-overlap', type=float, default=0.5,
+                        help='share of update rows that change existing customers (default: 0.5)')
+    parser.add_argument('--duplicate-rate', type=float, default=0.0,
+                        help='share of rows repeated with the same customer_id (default: 0)')
+    parser.add_argument('--region-skew', type=float, default=1.0,
+                        help='0 spreads customers evenly over regions, higher values concentrate them (default: 1)')
+    parser.add_argument('--null-rate', type=float, default=0.0,
+                        help='share of nullable fields left empty (default: 0)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    for value in args.rows:
+        rows = parse_rows(value)
+        files = generate(rows, args.output_dir, parse_rows(args.update_rows), args.update_overlap,
+                         args.duplicate_rate, args.region_skew, args.null_rate, args.seed)
+        for kind, info in files.items():
+            print(f"{kind}: {info['path']} ({info['rows']} rows)")
@@ -0,0 +1,393 @@
+import os
+import re
+import json
+import time
+import atexit
+import pickle
+import urllib
+import hashlib
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# SQLAlchemy and pandas are imported on first use so that importing this
+# module stays cheap for commands that never touch the database.
+# DB_BACKEND=sqlite swaps SQL Server for an embedded SQLite file
+# (SQLITE_PATH), see sqlite_backend.py; everything else goes through the
+# functions below and does not need to know which one is in use.
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+# Query results are cached per data version, i.e. the newest enrichment_audit
+# row. Every completed load writes one, so a load invalidates the cache for
+# every process without any coordination. Results are also written to
+# QUERY_CACHE_DIR, so the next scheduled report or validate run on this
+# machine starts from them instead of an empty cache.
+DATA_VERSION_SQL = """
+SELECT TOP 1 audit_id, batch_id, processing_end
+FROM enrichment_audit
+ORDER BY audit_id DESC
+"""
+_query_cache = OrderedDict()
+_query_cache_lock = threading.Lock()
+
+# Opt-in query profile (QUERY_PROFILE=1 or main.py --profile): every
+# statement executed through _fetch and read_sql is timed, with rows
+# returned and, on SQL Server, logical reads from SET STATISTICS IO.
+# Cache hits execute nothing and are not recorded; results cached on
+# disk by an earlier run are not used while profiling.
+_profile = None
+_profile_lock = threading.Lock()
+LOGICAL_READS = re.compile(r'logical reads (\d+)')
+
+
+def get_database_name():
+    return os.getenv('DB_NAME', 'customer_warehouse')
+
+
+def get_connection_string(database=None):
+    # database overrides DB_NAME, e.g. master while creating the database
+    if os.getenv('DB_BACKEND', 'mssql') == 'sqlite':
+        return f"sqlite:///{os.getenv('SQLITE_PATH', 'customer_warehouse.db')}"
+
+    server = os.getenv('DB_SERVER', 'localhost')
+    database = database or get_database_name()
+    driver = os.getenv('DB_DRIVER', 'ODBC Driver 17 for SQL Server')
+    username = os.getenv('DB_USER')
+    password = os.getenv('DB_PASSWORD')
+
+    if username:
+        auth = f"UID={username};PWD={password};"
+    else:
+        auth = "Trusted_Connection=yes;"
+
+    return (
+        f"DRIVER={{{driver}}};"
+        f"SERVER={server};"
+        f"DATABASE={database};"
+        f"{auth}"
+    )
+
+
+def get_engine(connection_string=None):
+    # One pooled engine per connection string, shared by the loader,
+    # validators and reports for the life of the process
+    connection_string = connection_string or get_connection_string()
+    with _engines_lock:
+        engine = _engines.get(connection_string)
+        if engine is None:
+            from sqlalchemy import create_engine
+            params = urllib.parse.quote_plus(connection_string)
+            engine = create_engine(
+                f"mssql+pyodbc:///?odbc_connect={params}",
+                pool_size=int(os.getenv('DB_POOL_SIZE', 5)),
+                max_overflow=int(os.getenv('DB_POOL_MAX_OVERFLOW', 10)),
+                pool_pre_ping=True,
+                pool_recycle=int(os.getenv('DB_POOL_RECYCLE', 1800))
+            )
+            _engines[connection_string] = engine
+    return engine
+
+
+def pool_capacity(connection_string=None):
+    # Most connections one process can hold at once, None when unbounded
+    # (SQLite, or a negative DB_POOL_MAX_OVERFLOW)
+    if is_sqlite(connection_string):
+        return None
+    overflow = int(os.getenv('DB_POOL_MAX_OVERFLOW', 10))
+    if overflow < 0:
+        return None
+    return int(os.getenv('DB_POOL_SIZE', 5)) + overflow
+
+
+def is_sqlite(connection_string=None):
+    return (connection_string or get_connection_string()).startswith('sqlite:///')
+
+
+def get_connection(connection_string=None):
+    # Raw pyodbc connection checked out of the pool, close() returns it
+    connection_string = connection_string or get_connection_string()
+    if is_sqlite(connection_string):
+        import sqlite_backend
+        return sqlite_backend.connect(connection_string)
+    return get_engine(connection_string).raw_connection()
+
+
+def dispose_engines():
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+
+
+def enable_profiling():
+    global _profile
+    with _profile_lock:
+        if _profile is None:
+            _profile = []
+
+
+def _logical_reads(cursor):
+    # STATISTICS IO arrives as informational messages (pyodbc >= 4.0.31),
+    # some of them only once the following result sets are consumed
+    messages = list(getattr(cursor, 'messages', None) or [])
+    while cursor.nextset():
+        messages.extend(getattr(cursor, 'messages', None) or [])
+    reads = [int(count) for message in messages for count in LOGICAL_READS.findall(str(message[-1]))]
+    return sum(reads) if reads else None
+
+
+def _profiled(sql, connection_string, cursor):
+    statistics = not is_sqlite(connection_string)
+    if statistics:
+        cursor.execute("SET STATISTICS IO ON")
+    try:
+        start = time.perf_counter()
+        cursor.execute(sql)
+        rows = cursor.fetchall()
+        seconds = time.perf_counter() - start
+        logical_reads = _logical_reads(cursor) if statistics else None
+    finally:
+        # The connection goes back to the pool with the setting otherwise
+        if statistics:
+            cursor.execute("SET STATISTICS IO OFF")
+    text = ' '.join(sql.split())
+    record = {
+        'sql_hash': hashlib.sha1(text.encode()).hexdigest()[:12],
+        'sql': text,
+        'seconds': seconds,
+        'rows': len(rows),
+        'logical_reads': logical_reads,
+    }
+    with _profile_lock:
+        if _profile is not None:
+            _profile.append(record)
+    return rows
+
+
+def _execute(sql, connection_string=None):
+    conn = get_connection(connection_string)
+    try:
+        cursor = conn.cursor()
+        if _profile is not None:
+            rows = _profiled(sql, connection_string or get_connection_string(), cursor)
+        else:
+            cursor.execute(sql)
+            rows = cursor.fetchall()
+        return cursor.description, rows
+    finally:
+        conn.close()
+
+
+def _fetch(sql, connection_string=None):
+    return _execute(sql, connection_string)[1]
+
+
+def profile_summary(top=10):
+    # One entry per distinct statement, slowest total time first
+    with _profile_lock:
+        records = list(_profile or [])
+    queries = {}
+    for record in records:
+        query = queries.setdefault(record['sql_hash'], {
+            'sql_hash': record['sql_hash'], 'sql': record['sql'], 'calls': 0,
+            'seconds': 0.0, 'max_seconds': 0.0, 'rows': 0, 'logical_reads': None,
+        })
+        query['calls'] += 1
+        query['seconds'] += record['seconds']
+        query['max_seconds'] = max(query['max_seconds'], record['seconds'])
+        query['rows'] += record['rows']
+        if record['logical_reads'] is not None:
+            query['logical_reads'] = (query['logical_reads'] or 0) + record['logical_reads']
+    ranked = sorted(queries.values(), key=lambda query: -query['seconds'])
+    for query in ranked:
+        query['seconds'] = round(query['seconds'], 4)
+        query['max_seconds'] = round(query['max_seconds'], 4)
+    return {
+        'statements': len(records),
+        'seconds': round(sum(record['seconds'] for record in records), 4),
+        'queries': ranked[:top] if top else ranked,
+    }
+
+
+def report_profile(top=10, json_path=None):
+    # Prints the top slowest queries, dumps all of them to json_path and
+    # clears the profile, so a run that also exits with QUERY_PROFILE set
+    # does not report twice
+    global _profile
+    summary = profile_summary(0)
+    with _profile_lock:
+        if _profile is not None:
+            _profile = []
+    print(f"\n~ Query Profile: {summary['statements']} statements, {summary['seconds']:.2f}s ~")
+    print(f"{'seconds':>9} {'calls':>5} {'rows':>8} {'reads':>9}  query")
+    for query in summary['queries'][:top]:
+        reads = query['logical_reads'] if query['logical_reads'] is not None else '-'
+        print(f"{query['seconds']:>9.3f} {query['calls']:>5} {query['rows']:>8} {reads:>9}  "
+              f"{query['sql_hash']} {query['sql'][:70]}")
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Query profile written to {json_path}")
+    return summary
+
+
+def _report_profile_at_exit():
+    if _profile:
+        report_profile(int(os.getenv('QUERY_PROFILE_TOP', 10)), os.getenv('QUERY_PROFILE_JSON'))
+
+
+def data_version(connection_string=None):
+    rows = _fetch(DATA_VERSION_SQL, connection_string)
+    return tuple(rows[0]) if rows else ()
+
+
+def _cache_dir():
+    return os.getenv('QUERY_CACHE_DIR', '.query_cache')
+
+
+def _cache_path(key):
+    # <connection>-<data version>-<query>.pickle, so a new version can drop
+    # the files of the old one
+    connection_hash, version_hash, query_hash = (
+        hashlib.sha1(repr(part).encode()).hexdigest()[:12] for part in (key[1], key[3], key[:3])
+    )
+    return os.path.join(_cache_dir(), f"{connection_hash}-{version_hash}-{query_hash}.pickle")
+
+
+def _read_cached(key, ttl):
+    # A profiled run measures the queries, not results of an earlier run
+    if not _cache_dir() or _profile is not None:
+        return None
+    try:
+        with open(_cache_path(key), 'rb') as f:
+            saved, value = pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError, AttributeError):
+        return None
+    if ttl and time.time() - saved >= ttl:
+        return None
+    if key[0] == 'rows':
+        # Stored as (description, tuples), rows come back like pyodbc rows
+        from sqlite_backend import row_class
+
+        description, rows = value
+        value = [row_class(description)(row) for row in rows]
+    return value
+
+
+def _write_cached(key, value):
+    if not _cache_dir():
+        return
+    path = _cache_path(key)
+    connection_prefix, version_prefix = os.path.basename(path).split('-')[:2]
+    if key[0] == 'rows':
+        value = (value[0].cursor_description if value else (), [tuple(row) for row in value])
+    _remove_cached(f"{connection_prefix}-", keep=f"{connection_prefix}-{version_prefix}-")
+    try:
+        os.makedirs(_cache_dir(), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}"
+        with open(temp_path, 'wb') as f:
+            pickle.dump((time.time(), value), f)
+        os.replace(temp_path, path)
+    except (OSError, pickle.PickleError) as e:
+        print(f"Could not write query cache: {e}")
+
+
+def _remove_cached(prefix='', keep=None):
+    if not _cache_dir() or not os.path.isdir(_cache_dir()):
+        return
+    for name in os.listdir(_cache_dir()):
+        if name.startswith(prefix) and not (keep and name.startswith(keep)):
+            try:
+                os.remove(os.path.join(_cache_dir(), name))
+            except OSError:
+                pass
+
+
+def clear_query_cache():
+    # Also drops the files, a load that committed without an audit row
+    # (failed partway) leaves the data version unchanged
+    with _query_cache_lock:
+        _query_cache.clear()
+    _remove_cached()
+
+
+def _cached(key, load):
+    size = int(os.getenv('QUERY_CACHE_SIZE', 128))
+    ttl = float(os.getenv('QUERY_CACHE_TTL', 0))
+    if size <= 0:
+        return load()
+    now = time.monotonic()
+    with _query_cache_lock:
+        entry = _query_cache.get(key)
+        if entry is not None and (not ttl or now - entry[0] < ttl):
+            _query_cache.move_to_end(key)
+            return entry[1]
+    value = _read_cached(key, ttl)
+    if value is None:
+        value = load()
+        _write_cached(key, value)
+    with _query_cache_lock:
+        _query_cache[key] = (now, value)
+        _query_cache.move_to_end(key)
+        while len(_query_cache) > size:
+            _query_cache.popitem(last=False)
+    return value
+
+
+def run_query(sql, connection_string=None, version=None):
+    # Callers running several queries look the version up once and pass it in
+    connection_string = connection_string or get_connection_string()
+    if version is None:
+        version = data_version(connection_string)
+    return _cached(('rows', connection_string, sql, version),
+                   lambda: _fetch(sql, connection_string))
+
+
+def read_sql(sql, connection_string=None):
+    import pandas as pd
+
+    connection_string = connection_string or get_connection_string()
+    version = data_version(connection_string)
+    if _profile is not None:
+        load = lambda: _frame(*_execute(sql, connection_string))
+    elif is_sqlite(connection_string):
+        import sqlite_backend
+        load = lambda: sqlite_backend.read_frame(sql, connection_string)
+    else:
+        load = lambda: pd.read_sql(sql, get_engine(connection_string))
+    df = _cached(('frame', connection_string, sql, version), load)
+    return df.copy()
+
+
+def _frame(description, rows):
+    import pandas as pd
+
+    return pd.DataFrame.from_records([tuple(row) for row in rows], columns=[column[0] for column in description],
+                                     coerce_float=True)
+
+
+def submit_queries(queries, executor):
+    # Each query runs on its own pooled connection; the futures keep the
+    # order of the queries dict so results can be printed deterministically
+    version = data_version()
+    return {name: executor.submit(run_query, sql, None, version) for name, sql in queries.items()}
+
+
+def collect_queries(futures):
+    return {name: future.result() for name, future in futures.items()}
+
+
+def run_queries(queries, executor=None):
+    if executor is None:
+        version = data_version()
+        return {name: run_query(sql, None, version) for name, sql in queries.items()}
+    return collect_queries(submit_queries(queries, executor))
+
+
+if os.getenv('QUERY_PROFILE', '').lower() in ('1', 'true', 'yes'):
+    enable_profiling()
+    atexit.register(_report_profile_at_exit)
@@ -0,0 +1,77 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from connection_manager import read_sql
+
+from validate_recordCount import print_recordCount
+from validate_completness import print_completeness
+from validate_riskDistribution import print_riskDistribution
+from validate_geoDistribution import print_geoDistribution
+from validate_auditTrailVerification import validate_auditTrailVerification
+
+
+# One scan of customer_enriched feeds the record count, completeness,
+# risk and geo validations: the () grouping set is the grand total row
+SUMMARY_QUERY = """
+    SELECT
+        GROUPING(calculated_risk) as risk_rolled_up,
+        GROUPING(region) as region_rolled_up,
+        calculated_risk,
+        region,
+        COUNT(*) as customer_count,
+        SUM(CASE WHEN first_name IS NOT NULL AND first_name != '' THEN 1 ELSE 0 END) as complete_names,
+        SUM(CASE WHEN email IS NOT NULL AND email != '' THEN 1 ELSE 0 END) as complete_emails,
+        SUM(CASE WHEN geo_enriched = 1 THEN 1 ELSE 0 END) as geo_enriched_count,
+        SUM(CASE WHEN is_business = 1 THEN 1 ELSE 0 END) as business_customers
+    FROM customer_enriched
+    GROUP BY GROUPING SETS ((calculated_risk), (region), ())
+    """
+
+
+def summarize(summary_df):
+    totals = summary_df[(summary_df['risk_rolled_up'] == 1) & (summary_df['region_rolled_up'] == 1)].iloc[0]
+    total_records = totals['customer_count']
+
+    completeness = totals[['complete_names', 'complete_emails', 'geo_enriched_count', 'business_customers']].copy()
+    completeness['total_records'] = total_records
+
+    risk_df = summary_df[(summary_df['risk_rolled_up'] == 0) & (summary_df['region_rolled_up'] == 1)]
+    risk_df = risk_df[['calculated_risk', 'customer_count']].copy()
+    risk_df['percentage'] = (risk_df['customer_count'] * 100.0 / total_records).round(1)
+    risk_df = risk_df.sort_values('customer_count', ascending=False).reset_index(drop=True)
+
+    geo_df = summary_df[(summary_df['region_rolled_up'] == 0) & (summary_df['risk_rolled_up'] == 1)]
+    geo_df = geo_df[geo_df['region'].notna() & (geo_df['region'] != 'Unknown')]
+    geo_df = geo_df[['region', 'customer_count']].nlargest(5, 'customer_count').reset_index(drop=True)
+
+    return {
+        'record_count': total_records,
+        'completeness': completeness,
+        'risk_distribution': risk_df,
+        'geo_distribution': geo_df,
+    }
+
+
+def validate_all():
+    metrics = summarize(read_sql(SUMMARY_QUERY))
+
+    sections = [
+        ('Record Count', print_recordCount, metrics['record_count']),
+        ('Completeness', print_completeness, metrics['completeness']),
+        ('Risk Distribution', print_riskDistribution, metrics['risk_distribution']),
+        ('Geographic Distribution', print_geoDistribution, metrics['geo_distribution']),
+    ]
+    for name, printer, value in sections:
+        print(f"\n{'='*50}")
+        print(f"{name}:")
+        printer(value)
+
+    print(f"\n{'='*50}")
+    print("Audit Trail Verification:")
+    validate_auditTrailVerification()
+    return metrics
+
+
+if __name__ == "__main__":
+    validate_all()
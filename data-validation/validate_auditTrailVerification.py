@@ -1,17 +1,10 @@
-import pyodbc
-import pandas as pd
-import urllib 
-from sqlalchemy import create_engine
+import os
+import sys
 
-def validate_auditTrailVerification():
-    SERVER = 'localhost'
-    DATABASE = 'customer_warehouse'
-
-    warehouse_connection_string = f'DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={SERVER};DATABASE={DATABASE};Trusted_Connection=yes;'
-    
-    params = urllib.parse.quote_plus(warehouse_connection_string)
-    engine = create_engine(f"mssql+pyodbc:///?odbc_connect={params}")
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from connection_manager import read_sql
 
+def validate_auditTrailVerification():
     audit_query = """
         SELECT 
             batch_id,
@@ -24,12 +17,42 @@ def validate_auditTrailVerification():
         FROM enrichment_audit 
         ORDER BY processing_start DESC
         """
-        
-    audit_df = pd.read_sql(audit_query, engine)
+    stage_query = """
+        SELECT
+            batch_id,
+            stage,
+            SUM(seconds) as seconds,
+            SUM(rows_processed) as rows_processed,
+            MAX(peak_memory_mb) as peak_memory_mb
+        FROM load_stage_metrics
+        GROUP BY batch_id, stage
+        """
+
+    audit_df = read_sql(audit_query)
+    try:
+        stages = dict(tuple(read_sql(stage_query).groupby('batch_id')))
+    except Exception as e:
+        print(f"Stage metrics unavailable: {e}")
+        stages = {}
     print(f"Recent Processing Batches:")
     for _, row in audit_df.iterrows():
         success_rate = (row['records_successful'] / row['records_processed'] * 100) if row['records_processed'] > 0 else 0
         print(f"   Batch: {str(row['batch_id'])[:8]}... | {row['records_processed']} records | {success_rate:.1f}% success | {row['duration_seconds']}s")
+        if row['batch_id'] in stages:
+            print_stageMetrics(stages[row['batch_id']])
+
+
+def print_stageMetrics(stage_df, top=4):
+    # Slowest stages first, rows/sec where the stage handles rows
+    stage_df = stage_df.sort_values('seconds', ascending=False)
+    parts = []
+    for _, stage in stage_df.head(top).iterrows():
+        rate = f" ({stage['rows_processed'] / stage['seconds']:,.0f} rows/s)" if stage['rows_processed'] and stage['seconds'] else ""
+        parts.append(f"{stage['stage']} {stage['seconds']:.2f}s{rate}")
+    peak = stage_df['peak_memory_mb'].max()
+    if peak == peak:
+        parts.append(f"peak {peak:.0f} MB")
+    print(f"      Stages: {' | '.join(parts)}")
 
 
 if __name__ == "__main__":
@@ -1,18 +1,18 @@
 
-import pyodbc
-import pandas as pd
-import urllib 
-from sqlalchemy import create_engine
+import os
+import sys
 
-def validate_completeness():
-    SERVER = 'localhost'
-    DATABASE = 'customer_warehouse'
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from connection_manager import read_sql
 
-    warehouse_connection_string = f'DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={SERVER};DATABASE={DATABASE};Trusted_Connection=yes;'
+def print_completeness(comp):
+    print(f"Name completeness: {comp['complete_names']}/{comp['total_records']} ({comp['complete_names']/comp['total_records']:.1%})")
+    print(f"Email completeness: {comp['complete_emails']}/{comp['total_records']} ({comp['complete_emails']/comp['total_records']:.1%})")
+    print(f"Geographic enrichment: {comp['geo_enriched_count']}/{comp['total_records']} ({comp['geo_enriched_count']/comp['total_records']:.1%})")
+    print(f"Business customers: {comp['business_customers']}/{comp['total_records']} ({comp['business_customers']/comp['total_records']:.1%})")
 
-    params = urllib.parse.quote_plus(warehouse_connection_string)
-    engine = create_engine(f"mssql+pyodbc:///?odbc_connect={params}")
 
+def validate_completeness():
     completeness_query = """
         SELECT 
             COUNT(*) as total_records,
@@ -23,11 +23,8 @@ def validate_completeness():
         FROM customer_enriched
         """
         
-    completeness_df = pd.read_sql(completeness_query, engine)
+    completeness_df = read_sql(completeness_query)
     comp = completeness_df.iloc[0]
-        
-    print(f"Name completeness: {comp['complete_names']}/{comp['total_records']} ({comp['complete_names']/comp['total_records']:.1%})")
-    print(f"Email completeness: {comp['complete_emails']}/{comp['total_records']} ({comp['complete_emails']/comp['total_records']:.1%})")
-    print(f"Geographic enrichment: {comp['geo_enriched_count']}/{comp['total_records']} ({comp['geo_enriched_count']/comp['total_records']:.1%})")
-    print(f"Business customers: {comp['business_customers']}/{comp['total_records']} ({comp['business_customers']/comp['total_records']:.1%})")
+    print_completeness(comp)
+    return comp
 
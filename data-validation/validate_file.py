@@ -0,0 +1,85 @@
+import os
+import sys
+import pandas as pd
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'etl-pipeline'))
+from etl_schema import CSV_DTYPES, apply_schema
+
+from validate_recordCount import print_recordCount
+from validate_completness import print_completeness
+from validate_riskDistribution import print_riskDistribution
+from validate_geoDistribution import print_geoDistribution
+
+
+def _filled(series):
+    return series.notna() & (series.astype('string') != '')
+
+
+def _distribution(counts, column):
+    # Same shape as the risk/geo validation queries: value, count, percentage
+    counts = counts[counts > 0]
+    df = counts.rename_axis(column).reset_index(name='customer_count')
+    df['percentage'] = (df['customer_count'] * 100.0 / df['customer_count'].sum()).round(1)
+    return df.sort_values('customer_count', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def check_file(file_path):
+    df = apply_schema(pd.read_csv(file_path, dtype=CSV_DTYPES))
+
+    completeness = {
+        'total_records': len(df),
+        'complete_names': int(_filled(df['first_name']).sum()),
+        'complete_emails': int(_filled(df['email']).sum()),
+        'geo_enriched_count': int((df['geo_enriched'] == 1).sum()),
+        'business_customers': int((df['is_business'] == 1).sum()),
+    }
+
+    risk_df = _distribution(df['calculated_risk'].value_counts(dropna=False, sort=False), 'calculated_risk')
+
+    regions = df['region'][df['region'].notna() & (df['region'] != 'Unknown')]
+    geo_df = _distribution(regions.value_counts(sort=False), 'region').head(5)
+
+    errors = []
+    if df.empty:
+        errors.append("file contains no records")
+    rejected = df[df['reject_reason'].notna()]
+    errors.extend(
+        f"customer {customer_id}: {reason}"
+        for customer_id, reason in zip(rejected['customer_id'], rejected['reject_reason'])
+    )
+    duplicated = df['customer_id'].duplicated(keep=False) & df['customer_id'].notna()
+    duplicate_ids = df.loc[duplicated, 'customer_id'].unique()
+    errors.extend(f"customer {customer_id}: duplicate customer_id in file" for customer_id in duplicate_ids)
+
+    return {
+        'file': str(file_path),
+        'record_count': len(df),
+        'completeness': completeness,
+        'risk_distribution': risk_df,
+        'geo_distribution': geo_df,
+        'rejected_records': len(rejected),
+        'duplicate_ids': len(duplicate_ids),
+        'errors': errors,
+        'passed': not errors,
+    }
+
+
+def validate_file(file_path):
+    result = check_file(file_path)
+    print(f"File Validation: {Path(file_path).name}")
+    print_recordCount(result['record_count'], source='file')
+    if result['record_count']:
+        print_completeness(result['completeness'])
+    print_riskDistribution(result['risk_distribution'])
+    print_geoDistribution(result['geo_distribution'])
+    print(f"Rejected records: {result['rejected_records']}")
+    print(f"Duplicate customer IDs: {result['duplicate_ids']}")
+    for error in result['errors'][:5]:
+        print(f"   - {error}")
+    print("File PASSED validation" if result['passed'] else "File FAILED validation")
+    return result
+
+
+if __name__ == "__main__":
+    validate_file(sys.argv[1])
@@ -1,17 +1,16 @@
-import pyodbc
-import pandas as pd
-import urllib 
-from sqlalchemy import create_engine
+import os
+import sys
 
-def validate_geoDistribution():
-    SERVER = 'localhost'
-    DATABASE = 'customer_warehouse'
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from connection_manager import read_sql
+
+def print_geoDistribution(geo_df):
+    print(f"Top Regions by Customer Count:")
+    for _, row in geo_df.iterrows():
+        print(f"   {row['region']}: {row['customer_count']} customers")
 
-    warehouse_connection_string = f'DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={SERVER};DATABASE={DATABASE};Trusted_Connection=yes;'
-    
-    params = urllib.parse.quote_plus(warehouse_connection_string)
-    engine = create_engine(f"mssql+pyodbc:///?odbc_connect={params}")
 
+def validate_geoDistribution():
     geo_query = """
         SELECT TOP 5
             region,
@@ -22,10 +21,9 @@ def validate_geoDistribution():
         ORDER BY customer_count DESC
     """
         
-    geo_df = pd.read_sql(geo_query, engine)
-    print(f"Top Regions by Customer Count:")
-    for _, row in geo_df.iterrows():
-        print(f"   {row['region']}: {row['customer_count']} customers")
+    geo_df = read_sql(geo_query)
+    print_geoDistribution(geo_df)
+    return geo_df
 
 
 if __name__ == "__main__":
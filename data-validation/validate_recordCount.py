@@ -1,21 +1,17 @@
-import pyodbc
-import pandas as pd
-import urllib 
-from sqlalchemy import create_engine
-
-def validate_recordCount():
-    SERVER = 'localhost'
-    DATABASE = 'customer_warehouse'
+import os
+import sys
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from connection_manager import read_sql
 
-    warehouse_connection_string = f'DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={SERVER};DATABASE={DATABASE};Trusted_Connection=yes;'
+def print_recordCount(total_records, source='database'):
+    print(f"Total records in {source}: {total_records}")
 
 
-    params = urllib.parse.quote_plus(warehouse_connection_string)
-    engine = create_engine(f"mssql+pyodbc:///?odbc_connect={params}")
-
+def validate_recordCount():
     count_query = "SELECT COUNT(*) FROM customer_enriched"
-    total_records = pd.read_sql(count_query, engine).iloc[0, 0]
-    print(f"Total records in database: {total_records}")
+    total_records = read_sql(count_query).iloc[0, 0]
+    print_recordCount(total_records)
+    return total_records
 
    
\ No newline at end of file
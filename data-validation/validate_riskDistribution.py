@@ -1,18 +1,16 @@
-import pyodbc
-import pandas as pd
-import urllib 
-from sqlalchemy import create_engine
+import os
+import sys
 
-def validate_riskDistribution():
-    # Database connection configuration
-    SERVER = 'localhost'
-    DATABASE = 'customer_warehouse'
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from connection_manager import read_sql
+
+def print_riskDistribution(risk_df):
+    print(f"Risk Distribution:")
+    for _, row in risk_df.iterrows():
+        print(f"   {row['calculated_risk']} Risk: {row['customer_count']} customers ({row['percentage']}%)")
 
-    warehouse_connection_string = f'DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={SERVER};DATABASE={DATABASE};Trusted_Connection=yes;'
-    
-    params = urllib.parse.quote_plus(warehouse_connection_string)
-    engine = create_engine(f"mssql+pyodbc:///?odbc_connect={params}")
 
+def validate_riskDistribution():
     risk_query = """
         SELECT 
             calculated_risk,
@@ -23,10 +21,9 @@ def validate_riskDistribution():
         ORDER BY customer_count DESC
         """
         
-    risk_df = pd.read_sql(risk_query, engine)
-    print(f"Risk Distribution:")
-    for _, row in risk_df.iterrows():
-        print(f"   {row['calculated_risk']} Risk: {row['customer_count']} customers ({row['percentage']}%)")
+    risk_df = read_sql(risk_query)
+    print_riskDistribution(risk_df)
+    return risk_df
 
 
 if __name__ == "__main__":
@@ -11,6 +11,21 @@ IF OBJECT_ID('dbo.customer_enriched', 'U') IS NOT NULL
 IF OBJECT_ID('dbo.enrichment_audit', 'U') IS NOT NULL
     DROP TABLE dbo.enrichment_audit;
 
+IF OBJECT_ID('dbo.customer_enriched_staging', 'U') IS NOT NULL
+    DROP TABLE dbo.customer_enriched_staging;
+
+IF OBJECT_ID('dbo.load_checkpoint', 'U') IS NOT NULL
+    DROP TABLE dbo.load_checkpoint;
+
+IF OBJECT_ID('dbo.customer_summary', 'U') IS NOT NULL
+    DROP TABLE dbo.customer_summary;
+
+IF OBJECT_ID('dbo.load_rejects', 'U') IS NOT NULL
+    DROP TABLE dbo.load_rejects;
+
+IF OBJECT_ID('dbo.load_stage_metrics', 'U') IS NOT NULL
+    DROP TABLE dbo.load_stage_metrics;
+
 -- Main customer data table
 CREATE TABLE dbo.customer_enriched (
     customer_id INT PRIMARY KEY,
@@ -47,6 +62,7 @@ CREATE TABLE dbo.customer_enriched (
     processed_date DATETIME2 DEFAULT GETDATE(),
     data_source NVARCHAR(50),
     enrichment_status NVARCHAR(50),
+    row_hash BIGINT, -- content hash used to skip no-op updates
     
     -- Audit fields
     created_date DATETIME2 DEFAULT GETDATE(),
@@ -68,6 +84,96 @@ CREATE TABLE dbo.enrichment_audit (
     pipeline_version NVARCHAR(20)
 );
 
+-- Commit checkpoints so an interrupted load can resume by batch_id
+CREATE TABLE dbo.load_checkpoint (
+    batch_id UNIQUEIDENTIFIER PRIMARY KEY,
+    source_file NVARCHAR(500),
+    load_mode NVARCHAR(20),
+    rows_committed BIGINT NOT NULL DEFAULT 0,
+    successful_inserts INT DEFAULT 0,
+    successful_updates INT DEFAULT 0,
+    unchanged_records INT DEFAULT 0,
+    collapsed_records INT DEFAULT 0,
+    failed_records INT DEFAULT 0,
+    status NVARCHAR(20), -- RUNNING, COMPLETE
+    created_date DATETIME2 DEFAULT GETDATE(),
+    modified_date DATETIME2 DEFAULT GETDATE()
+);
+
+-- Staging table for MERGE loads, each load owns the rows for its batch_id
+CREATE TABLE dbo.customer_enriched_staging (
+    batch_id UNIQUEIDENTIFIER NOT NULL,
+    customer_id INT NOT NULL,
+    first_name NVARCHAR(50),
+    last_name NVARCHAR(50),
+    email NVARCHAR(100),
+    phone NVARCHAR(20),
+    postcode NVARCHAR(10),
+    region NVARCHAR(50),
+    country NVARCHAR(50),
+    district NVARCHAR(50),
+    longitude DECIMAL(10,7),
+    latitude DECIMAL(10,7),
+    geo_enriched BIT,
+    company NVARCHAR(100),
+    company_size NVARCHAR(50),
+    industry NVARCHAR(50),
+    annual_revenue NVARCHAR(50),
+    is_business BIT,
+    calculated_risk NVARCHAR(20),
+    risk_score_numeric INT,
+    risk_factors NVARCHAR(500),
+    status NVARCHAR(20),
+    processed_date DATETIME2,
+    data_source NVARCHAR(50),
+    enrichment_status NVARCHAR(50),
+    row_hash BIGINT
+);
+
+CREATE CLUSTERED INDEX IX_customer_enriched_staging_batch
+    ON dbo.customer_enriched_staging(batch_id, customer_id);
+
+-- Rows a load could not apply, with the error, for fixing and reloading
+CREATE TABLE dbo.load_rejects (
+    reject_id INT IDENTITY(1,1) PRIMARY KEY,
+    batch_id UNIQUEIDENTIFIER NOT NULL,
+    customer_id INT,
+    error_message NVARCHAR(1000),
+    row_data NVARCHAR(MAX), -- the prepared row as JSON
+    created_date DATETIME2 DEFAULT GETDATE()
+);
+
+CREATE INDEX IX_load_rejects_batch
+    ON dbo.load_rejects(batch_id);
+
+-- Time spent per load stage (csv_parse, prepare, existence_check, insert,
+-- update, commit, audit, ...), one row per stage per load of a batch
+CREATE TABLE dbo.load_stage_metrics (
+    metric_id INT IDENTITY(1,1) PRIMARY KEY,
+    batch_id UNIQUEIDENTIFIER NOT NULL,
+    stage NVARCHAR(50) NOT NULL,
+    seconds FLOAT,
+    rows_processed BIGINT,
+    calls INT,
+    rows_per_sec FLOAT,
+    peak_memory_mb FLOAT, -- process peak RSS when the stage last ran
+    created_date DATETIME2 DEFAULT GETDATE()
+);
+
+CREATE INDEX IX_load_stage_metrics_batch
+    ON dbo.load_stage_metrics(batch_id);
+
+-- Report aggregates, kept up to date by the loader with +/- deltas
+CREATE TABLE dbo.customer_summary (
+    dimension NVARCHAR(50) NOT NULL, -- region, risk, industry, ...
+    key1 NVARCHAR(200),
+    key2 NVARCHAR(200),
+    customer_count INT NOT NULL
+);
+
+CREATE UNIQUE CLUSTERED INDEX IX_customer_summary_key
+    ON dbo.customer_summary(dimension, key1, key2);
+
 -- Create indexes for better query performance
 CREATE INDEX IX_customer_enriched_region 
     ON dbo.customer_enriched(region);
@@ -84,4 +190,9 @@ CREATE INDEX IX_customer_enriched_status
 PRINT '   Data warehouse tables created successfully';
 PRINT '   - customer_enriched (main data table)';
 PRINT '   - enrichment_audit (processing audit trail)';
+PRINT '   - load_checkpoint (resumable load checkpoints)';
+PRINT '   - customer_enriched_staging (MERGE load staging)';
+PRINT '   - customer_summary (report aggregates)';
+PRINT '   - load_rejects (rejected rows per batch)';
+PRINT '   - load_stage_metrics (per-stage load timings)';
 PRINT '   - Performance indexes created';
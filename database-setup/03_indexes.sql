@@ -0,0 +1,31 @@
+-- report_indexes.sql
+-- Managed index set for the report, validation and audit queries that still
+-- read the base tables. Grouped counts come from customer_summary, so the
+-- dimensions get no indexes of their own: they would only slow the loads.
+-- Every index is dropped and recreated, so orchestration.py --indexes can
+-- re-apply the set to an existing database.
+
+USE customer_warehouse;
+PRINT '=== CREATING REPORT INDEXES ===';
+
+DROP INDEX IF EXISTS IX_customer_enriched_data_source ON dbo.customer_enriched;
+DROP INDEX IF EXISTS IX_customer_enriched_top_risk ON dbo.customer_enriched;
+DROP INDEX IF EXISTS IX_enrichment_audit_processing_start ON dbo.enrichment_audit;
+
+-- Data source tracking (MIN/MAX processed_date per source) and the
+-- freshness check, which scans this instead of the table
+CREATE INDEX IX_customer_enriched_data_source
+    ON dbo.customer_enriched(data_source, processed_date);
+
+-- Top risk customers: only High and Medium rows, already in score order
+CREATE INDEX IX_customer_enriched_top_risk
+    ON dbo.customer_enriched(risk_score_numeric DESC)
+    INCLUDE (calculated_risk, first_name, last_name, risk_factors)
+    WHERE calculated_risk IN ('High', 'Medium');
+
+-- Recent batches in the audit trail and enrichment status report
+CREATE INDEX IX_enrichment_audit_processing_start
+    ON dbo.enrichment_audit(processing_start DESC)
+    INCLUDE (batch_id, records_processed, records_successful, records_failed, processing_end);
+
+PRINT '   Report indexes created';
@@ -1,26 +1,79 @@
-﻿import sys
-import pyodbc
+﻿import os
+import re
+import sys
+import argparse
 from pathlib import Path
 
-# --- CONFIG ---
-SERVER = "localhost"
-DATABASE = "customer_warehouse"
-DRIVER = "ODBC Driver 17 for SQL Server"
-TRUSTED_CONNECTION = "yes"
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from connection_manager import get_connection_string, get_database_name, is_sqlite
+
+# --- Options ---
+# *_indexes.sql files hold the managed index set; --indexes re-applies only
+# those to an existing database, --skip-indexes leaves them out (baseline
+# for benchmarks). The columnstore index is opt-in.
+parser = argparse.ArgumentParser(description="Create the warehouse database, tables and indexes")
+parser.add_argument("--indexes", action="store_true", help="only (re)apply the managed index set")
+parser.add_argument("--skip-indexes", action="store_true", help="create tables without the managed index set")
+parser.add_argument("--columnstore", action="store_true", default=os.getenv("DB_COLUMNSTORE") == "1",
+                    help="also create the optional columnstore index (SQL Server, or DB_COLUMNSTORE=1)")
+args = parser.parse_args()
+
+
+def select_files(paths):
+    if args.indexes:
+        return [path for path in paths if path.name.endswith("_indexes.sql")]
+    if args.skip_indexes:
+        return [path for path in paths if not path.name.endswith("_indexes.sql")]
+    return paths
+
 
 # --- Locate SQL files ---
 base_dir = Path(__file__).resolve().parent
-sql_files = sorted(base_dir.glob("*.sql"))
 
-if not sql_files:
+# --- Embedded SQLite backend (DB_BACKEND=sqlite) ---
+connection_string = get_connection_string()
+if is_sqlite(connection_string):
+    from sqlite_backend import run_script
+
+    if args.columnstore:
+        print("SQLite has no columnstore index, skipping it")
+    for sql_path in select_files(sorted((base_dir / "sqlite").glob("*.sql"))):
+        print(f"\nRunning sqlite/{sql_path.name}...")
+        try:
+            run_script(connection_string, sql_path.read_text(encoding="utf-8"))
+            print(f"Finished running {sql_path.name}")
+        except Exception as e:
+            print(f"Failed running {sql_path.name}: {e}")
+            sys.exit(1)
+    print(f"\nSetup completed successfully: {connection_string}")
+    sys.exit(0)
+
+import pyodbc
+
+# --- CONFIG ---
+# Server, driver and credentials come from the same DB_* settings as the
+# pipeline. The SQL files name the database customer_warehouse; DB_NAME
+# is substituted for it, so setup always targets the database loads use.
+DATABASE = get_database_name()
+if not re.fullmatch(r"\w+", DATABASE):
+    print(f"DB_NAME must be a plain identifier, got {DATABASE!r}")
+    sys.exit(1)
+
+all_sql_files = sorted(base_dir.glob("*.sql"))
+
+if not all_sql_files:
     print(f"No .sql files found in {base_dir}")
     sys.exit(1)
 
+sql_files = select_files(all_sql_files)
+if args.columnstore and not args.skip_indexes:
+    sql_files.append(base_dir / "optional" / "columnstore.sql")
+
 print(f"Found {len(sql_files)} SQL file(s): {[f.name for f in sql_files]}")
 
 # --- Build connection strings ---
-conn_str_master = f"DRIVER={{{DRIVER}}};SERVER={SERVER};DATABASE=master;Trusted_Connection={TRUSTED_CONNECTION};"
-conn_str_db = f"DRIVER={{{DRIVER}}};SERVER={SERVER};DATABASE={DATABASE};Trusted_Connection={TRUSTED_CONNECTION};"
+conn_str_master = get_connection_string("master")
+conn_str_db = get_connection_string(DATABASE)
 
 # --- Check connection to SQL Server ---
 try:
@@ -35,18 +88,18 @@ except Exception as e:
     sys.exit(1)
 
 # --- Run each SQL file ---
-for idx, sql_path in enumerate(sql_files, 1):
+for sql_path in sql_files:
     print(f"\nRunning {sql_path.name}...")
 
     with open(sql_path, "r", encoding="utf-8") as f:
-        sql_script = f.read()
+        sql_script = re.sub(r"\bcustomer_warehouse\b", DATABASE, f.read())
 
     # crude split on GO
     sql_script = sql_script.replace("\r\n", "\n").replace("\r", "\n")
     batches = [b.strip() for b in sql_script.split("GO") if b.strip()]
 
     # use master for the first file, target DB afterwards
-    conn_str = conn_str_master if idx == 1 else conn_str_db
+    conn_str = conn_str_master if sql_path == all_sql_files[0] else conn_str_db
 
     try:
         conn = pyodbc.connect(conn_str, autocommit=True)
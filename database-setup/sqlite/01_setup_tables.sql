@@ -0,0 +1,184 @@
+-- sqlite_tables.sql
+-- Same tables as 02_setup_tables.sql for the embedded SQLite backend
+-- (DB_BACKEND=sqlite), used for local runs, benchmarks and CI
+
+PRAGMA journal_mode = WAL;
+
+DROP TABLE IF EXISTS customer_enriched;
+DROP TABLE IF EXISTS enrichment_audit;
+DROP TABLE IF EXISTS customer_enriched_staging;
+DROP TABLE IF EXISTS load_checkpoint;
+DROP TABLE IF EXISTS customer_summary;
+DROP TABLE IF EXISTS load_rejects;
+DROP TABLE IF EXISTS load_stage_metrics;
+DROP TABLE IF EXISTS statistics_pending;
+
+CREATE TABLE customer_enriched (
+    customer_id INTEGER PRIMARY KEY,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    phone TEXT,
+    postcode TEXT,
+
+    -- Geographic enrichment
+    region TEXT,
+    country TEXT,
+    district TEXT,
+    longitude REAL,
+    latitude REAL,
+    geo_enriched INTEGER DEFAULT 0,
+
+    -- Business enrichment
+    company TEXT,
+    company_size TEXT,
+    industry TEXT,
+    annual_revenue TEXT,
+    is_business INTEGER DEFAULT 0,
+
+    -- Risk assessment
+    calculated_risk TEXT,
+    risk_score_numeric INTEGER,
+    risk_factors TEXT,
+
+    -- Account status
+    status TEXT,
+
+    -- ETL metadata
+    processed_date TEXT DEFAULT (datetime('now', 'localtime')),
+    data_source TEXT,
+    enrichment_status TEXT,
+    row_hash INTEGER,
+
+    -- Audit fields
+    created_date TEXT DEFAULT (datetime('now', 'localtime')),
+    modified_date TEXT DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE enrichment_audit (
+    audit_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch_id TEXT,
+    operation_type TEXT,
+    records_processed INTEGER,
+    records_successful INTEGER,
+    records_failed INTEGER,
+    processing_start TEXT,
+    processing_end TEXT,
+    duration_seconds INTEGER GENERATED ALWAYS AS (
+        CAST(strftime('%s', processing_end) AS INTEGER) - CAST(strftime('%s', processing_start) AS INTEGER)
+    ) VIRTUAL,
+    error_message TEXT,
+    pipeline_version TEXT
+);
+
+CREATE TABLE load_checkpoint (
+    batch_id TEXT PRIMARY KEY,
+    source_file TEXT,
+    load_mode TEXT,
+    rows_committed INTEGER NOT NULL DEFAULT 0,
+    successful_inserts INTEGER DEFAULT 0,
+    successful_updates INTEGER DEFAULT 0,
+    unchanged_records INTEGER DEFAULT 0,
+    collapsed_records INTEGER DEFAULT 0,
+    failed_records INTEGER DEFAULT 0,
+    status TEXT,
+    created_date TEXT DEFAULT (datetime('now', 'localtime')),
+    modified_date TEXT DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE customer_enriched_staging (
+    batch_id TEXT NOT NULL,
+    customer_id INTEGER NOT NULL,
+    first_name TEXT,
+    last_name TEXT,
+    email TEXT,
+    phone TEXT,
+    postcode TEXT,
+    region TEXT,
+    country TEXT,
+    district TEXT,
+    longitude REAL,
+    latitude REAL,
+    geo_enriched INTEGER,
+    company TEXT,
+    company_size TEXT,
+    industry TEXT,
+    annual_revenue TEXT,
+    is_business INTEGER,
+    calculated_risk TEXT,
+    risk_score_numeric INTEGER,
+    risk_factors TEXT,
+    status TEXT,
+    processed_date TEXT,
+    data_source TEXT,
+    enrichment_status TEXT,
+    row_hash INTEGER
+);
+
+CREATE INDEX IX_customer_enriched_staging_batch
+    ON customer_enriched_staging(batch_id, customer_id);
+
+CREATE TABLE load_rejects (
+    reject_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch_id TEXT NOT NULL,
+    customer_id INTEGER,
+    error_message TEXT,
+    row_data TEXT,
+    created_date TEXT DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE INDEX IX_load_rejects_batch
+    ON load_rejects(batch_id);
+
+CREATE TABLE load_stage_metrics (
+    metric_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    seconds REAL,
+    rows_processed INTEGER,
+    calls INTEGER,
+    rows_per_sec REAL,
+    peak_memory_mb REAL,
+    created_date TEXT DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE INDEX IX_load_stage_metrics_batch
+    ON load_stage_metrics(batch_id);
+
+-- Rows inserted per table since the loader last ran ANALYZE
+CREATE TABLE statistics_pending (
+    tbl TEXT PRIMARY KEY,
+    rows_inserted INTEGER NOT NULL
+);
+
+CREATE TABLE customer_summary (
+    dimension TEXT NOT NULL,
+    key1 TEXT,
+    key2 TEXT,
+    customer_count INTEGER NOT NULL
+);
+
+-- SQLite treats NULLs as distinct in a unique index, so the keys are
+-- indexed through IFNULL; the loader's upsert targets this expression
+CREATE UNIQUE INDEX IX_customer_summary_key
+    ON customer_summary(dimension, IFNULL(key1, char(0)), IFNULL(key2, char(0)));
+
+-- Matches the MERGE on SQL Server, which deletes rows whose count drops to 0
+CREATE TRIGGER customer_summary_prune
+AFTER UPDATE OF customer_count ON customer_summary
+WHEN NEW.customer_count = 0
+BEGIN
+    DELETE FROM customer_summary WHERE rowid = NEW.rowid;
+END;
+
+CREATE INDEX IX_customer_enriched_region
+    ON customer_enriched(region);
+
+CREATE INDEX IX_customer_enriched_risk
+    ON customer_enriched(calculated_risk);
+
+CREATE INDEX IX_customer_enriched_business
+    ON customer_enriched(is_business);
+
+CREATE INDEX IX_customer_enriched_status
+    ON customer_enriched(status);
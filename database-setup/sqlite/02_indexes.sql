@@ -0,0 +1,17 @@
+-- sqlite_indexes.sql
+-- Same index set as 03_indexes.sql, without the INCLUDE columns SQLite
+-- does not support; there is no columnstore equivalent.
+
+DROP INDEX IF EXISTS IX_customer_enriched_data_source;
+DROP INDEX IF EXISTS IX_customer_enriched_top_risk;
+DROP INDEX IF EXISTS IX_enrichment_audit_processing_start;
+
+CREATE INDEX IX_customer_enriched_data_source
+    ON customer_enriched(data_source, processed_date);
+
+CREATE INDEX IX_customer_enriched_top_risk
+    ON customer_enriched(risk_score_numeric DESC)
+    WHERE calculated_risk IN ('High', 'Medium');
+
+CREATE INDEX IX_enrichment_audit_processing_start
+    ON enrichment_audit(processing_start DESC);
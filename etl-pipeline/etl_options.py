@@ -0,0 +1,9 @@
+# Load options shared by etl_pipe and the main.py argument parser. Nothing
+# heavy is imported here, so the CLI can validate arguments without pandas.
+
+LOAD_MODES = ('row', 'bulk', 'merge', 'bcp')
+# How repeated customer_ids within one batch are collapsed before loading:
+# last row in the file wins, latest source processed_date wins, or reject them all
+DEDUP_POLICIES = ('last', 'processed_date', 'reject')
+# Loads commit and checkpoint every COMMIT_EVERY rows unless commit_every=0
+COMMIT_EVERY = 50000
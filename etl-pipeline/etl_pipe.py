@@ -1,103 +1,731 @@
-import pyodbc
+import os
+import sys
+import json
+import time
+import threading
 import pandas as pd
+from contextlib import contextmanager
 from datetime import datetime
 import uuid
-from typing import Dict
+import glob
+import numpy as np
+import itertools
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 from pathlib import Path
 
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from etl_options import COMMIT_EVERY, DEDUP_POLICIES, LOAD_MODES
+from etl_schema import CSV_DTYPES, apply_schema
+from etl_summary import (REBUILD_SUMMARY_SQL, STAGED_SUMMARY_DELTA_SQL, SUMMARY_COLUMNS,
+                         add_row_summary, add_summary_counts, apply_summary_delta)
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from connection_manager import clear_query_cache, get_connection, is_sqlite, pool_capacity
+from sqlite_backend import register_statements
+
+
+COLUMNS = [
+    'customer_id', 'first_name', 'last_name', 'email', 'phone', 'postcode',
+    'region', 'country', 'district', 'longitude', 'latitude', 'geo_enriched',
+    'company', 'company_size', 'industry', 'annual_revenue', 'is_business',
+    'calculated_risk', 'risk_score_numeric', 'risk_factors',
+    'status', 'processed_date', 'data_source', 'enrichment_status', 'row_hash'
+]
+UPDATE_COLUMNS = COLUMNS[1:] + ['customer_id']
+# processed_date and data_source are stamped on every load, so they are
+# left out of the content hash
+HASH_COLUMNS = [
+    column for column in COLUMNS
+    if column not in ('customer_id', 'processed_date', 'data_source', 'row_hash')
+]
+
+INSERT_SQL = """
+INSERT INTO customer_enriched (
+    customer_id, first_name, last_name, email, phone, postcode,
+    region, country, district, longitude, latitude, geo_enriched,
+    company, company_size, industry, annual_revenue, is_business,
+    calculated_risk, risk_score_numeric, risk_factors,
+    status, processed_date, data_source, enrichment_status, row_hash
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+UPDATE_SQL = """
+UPDATE customer_enriched SET
+    first_name = ?, last_name = ?, email = ?, phone = ?, postcode = ?,
+    region = ?, country = ?, district = ?, longitude = ?, latitude = ?, geo_enriched = ?,
+    company = ?, company_size = ?, industry = ?, annual_revenue = ?, is_business = ?,
+    calculated_risk = ?, risk_score_numeric = ?, risk_factors = ?,
+    status = ?, processed_date = ?, data_source = ?, enrichment_status = ?, row_hash = ?,
+    modified_date = GETDATE()
+WHERE customer_id = ?
+"""
+
+STAGE_COLUMNS = ['batch_id'] + COLUMNS
+
+STAGE_SQL = """
+INSERT INTO customer_enriched_staging (
+    batch_id, customer_id, first_name, last_name, email, phone, postcode,
+    region, country, district, longitude, latitude, geo_enriched,
+    company, company_size, industry, annual_revenue, is_business,
+    calculated_risk, risk_score_numeric, risk_factors,
+    status, processed_date, data_source, enrichment_status, row_hash
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+MERGE_SQL = f"""
+SET NOCOUNT ON;
+DECLARE @changes TABLE (action NVARCHAR(10));
+MERGE customer_enriched AS target
+USING (
+    SELECT {', '.join(COLUMNS)}
+    FROM customer_enriched_staging
+    WHERE batch_id = ?
+) AS source
+ON target.customer_id = source.customer_id
+WHEN MATCHED AND (target.row_hash IS NULL OR target.row_hash <> source.row_hash) THEN UPDATE SET
+    {', '.join(f'{column} = source.{column}' for column in COLUMNS[1:])},
+    modified_date = GETDATE()
+WHEN NOT MATCHED BY TARGET THEN
+    INSERT ({', '.join(COLUMNS)})
+    VALUES ({', '.join(f'source.{column}' for column in COLUMNS)})
+OUTPUT $action INTO @changes;
+SELECT
+    COALESCE(SUM(CASE WHEN action = 'INSERT' THEN 1 ELSE 0 END), 0) AS inserted,
+    COALESCE(SUM(CASE WHEN action = 'UPDATE' THEN 1 ELSE 0 END), 0) AS updated
+FROM @changes;
+"""
+
+# SQLite has no MERGE ... OUTPUT: count what will change first, then upsert
+register_statements(
+    MERGE_SQL,
+    "CREATE TEMP TABLE IF NOT EXISTS merge_changes (inserted INTEGER, updated INTEGER)",
+    "DELETE FROM merge_changes",
+    """
+INSERT INTO merge_changes (inserted, updated)
+SELECT COALESCE(SUM(e.customer_id IS NULL), 0), COALESCE(SUM(e.customer_id IS NOT NULL), 0)
+FROM customer_enriched_staging s
+LEFT JOIN customer_enriched e ON e.customer_id = s.customer_id
+WHERE s.batch_id = ?
+  AND (e.customer_id IS NULL OR e.row_hash IS NULL OR e.row_hash <> s.row_hash)
+""",
+    f"""
+INSERT INTO customer_enriched ({', '.join(COLUMNS)})
+SELECT {', '.join(COLUMNS)}
+FROM customer_enriched_staging
+WHERE batch_id = ?
+ON CONFLICT (customer_id) DO UPDATE SET
+    {', '.join(f'{column} = excluded.{column}' for column in COLUMNS[1:])},
+    modified_date = datetime('now', 'localtime')
+WHERE customer_enriched.row_hash IS NULL OR customer_enriched.row_hash <> excluded.row_hash
+""",
+    "SELECT inserted, updated FROM merge_changes",
+)
+
+CLEAR_STAGE_SQL = "DELETE FROM customer_enriched_staging WHERE batch_id = ?"
+
+CHECKPOINT_SQL = """
+MERGE load_checkpoint AS target
+USING (
+    SELECT ? AS batch_id, ? AS source_file, ? AS load_mode, ? AS rows_committed,
+           ? AS successful_inserts, ? AS successful_updates, ? AS unchanged_records,
+           ? AS collapsed_records, ? AS failed_records, ? AS status
+) AS source
+ON target.batch_id = source.batch_id
+WHEN MATCHED THEN UPDATE SET
+    rows_committed = source.rows_committed,
+    successful_inserts = source.successful_inserts,
+    successful_updates = source.successful_updates,
+    unchanged_records = source.unchanged_records,
+    collapsed_records = source.collapsed_records,
+    failed_records = source.failed_records,
+    status = source.status,
+    modified_date = GETDATE()
+WHEN NOT MATCHED THEN
+    INSERT (batch_id, source_file, load_mode, rows_committed, successful_inserts,
+            successful_updates, unchanged_records, collapsed_records, failed_records, status)
+    VALUES (source.batch_id, source.source_file, source.load_mode, source.rows_committed,
+            source.successful_inserts, source.successful_updates, source.unchanged_records,
+            source.collapsed_records, source.failed_records, source.status);
+"""
+
+register_statements(CHECKPOINT_SQL, """
+INSERT INTO load_checkpoint (batch_id, source_file, load_mode, rows_committed, successful_inserts,
+                             successful_updates, unchanged_records, collapsed_records, failed_records, status)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (batch_id) DO UPDATE SET
+    rows_committed = excluded.rows_committed,
+    successful_inserts = excluded.successful_inserts,
+    successful_updates = excluded.successful_updates,
+    unchanged_records = excluded.unchanged_records,
+    collapsed_records = excluded.collapsed_records,
+    failed_records = excluded.failed_records,
+    status = excluded.status,
+    modified_date = datetime('now', 'localtime')
+""")
+
+REJECT_SQL = """
+INSERT INTO load_rejects (batch_id, customer_id, error_message, row_data)
+VALUES (?, ?, ?, ?)
+"""
+
+STAGE_METRICS_SQL = """
+INSERT INTO load_stage_metrics (batch_id, stage, seconds, rows_processed, calls, rows_per_sec, peak_memory_mb)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# SQL Server keeps index statistics up to date by itself, SQLite only has
+# the ones ANALYZE writes; without them it passes over the filtered and
+# covering report indexes. The first number of each sqlite_stat1 row is
+# the row count when ANALYZE last ran; statistics_pending counts the rows
+# inserted since then.
+SQLITE_ANALYZED_ROWS_SQL = """
+SELECT MAX(CAST(stat AS INTEGER)) FROM sqlite_stat1 WHERE tbl = 'customer_enriched'
+"""
+
+SQLITE_PENDING_ROWS_SQL = """
+INSERT INTO statistics_pending (tbl, rows_inserted) VALUES ('customer_enriched', ?)
+ON CONFLICT (tbl) DO UPDATE SET rows_inserted = rows_inserted + excluded.rows_inserted
+RETURNING rows_inserted
+"""
+
+# bcp mode: the staging rows are written to a data file and loaded with a
+# minimally logged BULK INSERT. SQL Server reads the file itself, so
+# BULK_STAGE_DIR must be shared with the server; BULK_STAGE_SERVER_DIR is
+# the same directory as the server sees it, if the paths differ.
+BULK_INSERT_SQL = """
+BULK INSERT customer_enriched_staging
+FROM '{path}'
+WITH (
+    FORMAT = 'CSV',
+    FIELDQUOTE = '"',
+    FIELDTERMINATOR = ',',
+    ROWTERMINATOR = '0x0a',
+    CODEPAGE = '65001',
+    KEEPNULLS,
+    TABLOCK
+)
+"""
+
+BULK_CHUNK_SIZE = 10000
+# SQL Server caps a single statement at 2100 parameters
+KEY_LOOKUP_SIZE = 2000
+
+
+def _params(df: pd.DataFrame, columns) -> list:
+    frame = df[columns].astype(object)
+    return frame.where(df[columns].notna(), None).values.tolist()
+
+
+def _new_results(batch_id: str) -> Dict:
+    return {
+        'batch_id': batch_id,
+        'total_records': 0,
+        'successful_inserts': 0,
+        'successful_updates': 0,
+        'unchanged_records': 0,
+        'collapsed_records': 0,
+        'failed_records': 0,
+        'errors': [],
+        'processing_time': 0
+    }
+
+
+def _merge_results(results: Dict, partial: Dict):
+    for key in ('successful_inserts', 'successful_updates', 'unchanged_records',
+                'collapsed_records', 'failed_records'):
+        results[key] += partial[key]
+    results['errors'].extend(partial['errors'])
+
+
+def _peak_memory_mb() -> Optional[float]:
+    # High-water mark of the process RSS so far, ru_maxrss is KB on Linux
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _slices(chunks: Iterable[pd.DataFrame], size: Optional[int]) -> Iterator[pd.DataFrame]:
+    for df in chunks:
+        if not size:
+            yield df
+            continue
+        for start in range(0, len(df), size):
+            yield df.iloc[start:start + size]
+
+
+def _rollback(conn):
+    try:
+        conn.rollback()
+    except Exception as e:
+        print(f"error rolling back: {e}")
+
 
 class DatabaseLoader:
-    def __init__(self, connection_string: str):
+    def __init__(self, connection_string: str, chunk_size: int = BULK_CHUNK_SIZE,
+                 batch_id: Optional[str] = None, dedup: str = 'last',
+                 on_stage: Optional[Callable[[str, str, float, int], None]] = None):
+        # on_stage(batch_id, stage, seconds, rows) is called after every timed step
+        if dedup not in DEDUP_POLICIES:
+            raise ValueError(f"Unknown dedup policy '{dedup}', expected one of {DEDUP_POLICIES}")
         self.connection_string = connection_string
-        self.batch_id = str(uuid.uuid4())
-        
-    def load_data(self, df: pd.DataFrame) -> Dict:
+        self.batch_id = batch_id or str(uuid.uuid4())
+        self.chunk_size = chunk_size
+        self.dedup = dedup
+        self.on_stage = on_stage
+        self.source_file = None
+        self._stages = {}
+        self._stages_lock = threading.Lock()
+
+    @contextmanager
+    def timed(self, stage: str, rows: int = 0):
+        # Yields a dict whose 'rows' can be filled in once the count is known.
+        # Parallel partitions add up, so a stage can exceed the wall time.
+        event = {'rows': rows}
+        start = time.perf_counter()
+        try:
+            yield event
+        finally:
+            self.record_stage(stage, time.perf_counter() - start, event['rows'])
+
+    def record_stage(self, stage: str, seconds: float, rows: int = 0):
+        with self._stages_lock:
+            metric = self._stages.setdefault(stage, {'seconds': 0.0, 'rows': 0, 'calls': 0, 'peak_memory_mb': None})
+            metric['seconds'] += seconds
+            metric['rows'] += rows
+            metric['calls'] += 1
+            metric['peak_memory_mb'] = _peak_memory_mb()
+        if self.on_stage is not None:
+            try:
+                self.on_stage(self.batch_id, stage, seconds, rows)
+            except Exception as e:
+                print(f"on_stage callback failed for {stage}: {e}")
+
+    def stage_metrics(self) -> Dict:
+        with self._stages_lock:
+            return {
+                stage: {
+                    'seconds': round(metric['seconds'], 4),
+                    'rows': metric['rows'],
+                    'calls': metric['calls'],
+                    'rows_per_sec': round(metric['rows'] / metric['seconds']) if metric['rows'] and metric['seconds'] else None,
+                    'peak_memory_mb': metric['peak_memory_mb'],
+                }
+                for stage, metric in self._stages.items()
+            }
+
+    def load_data(self, df: pd.DataFrame, mode: str = 'row', workers: int = 1) -> Dict:
+        return self.load_chunks([df], mode=mode, workers=workers)
+
+    def load_chunks(self, chunks: Iterable[pd.DataFrame], mode: str = 'row',
+                    workers: int = 1, commit_every: Optional[int] = None,
+                    source_file: Optional[str] = None,
+                    resume_from: Optional[Dict] = None) -> Dict:
+        if mode not in LOAD_MODES:
+            raise ValueError(f"Unknown load mode '{mode}', expected one of {LOAD_MODES}")
+        if mode == 'bcp' and is_sqlite(self.connection_string):
+            raise ValueError("bcp mode needs SQL Server, use merge or bulk with SQLite")
+        if mode == 'bcp' and not os.getenv('BULK_STAGE_DIR'):
+            raise ValueError("bcp mode needs BULK_STAGE_DIR, a directory SQL Server can read")
+        # Every worker holds its own pooled connection for the whole load
+        capacity = pool_capacity(self.connection_string)
+        if capacity is not None and workers > capacity:
+            raise ValueError(f"{workers} workers need more than the {capacity} connections the pool allows, "
+                             f"raise DB_POOL_SIZE or DB_POOL_MAX_OVERFLOW")
         start_time = datetime.now()
-        results = {
-            'batch_id': self.batch_id,
-            'total_records': len(df),
-            'successful_inserts': 0,
-            'successful_updates': 0,
-            'failed_records': 0,
+        results = _new_results(self.batch_id)
+        if resume_from:
+            results['total_records'] = resume_from['rows_committed']
+            _merge_results(results, resume_from)
+        self.source_file = source_file
+        checkpointed = bool(commit_every or resume_from)
+        conns = []
+        try:
+            for _ in range(max(workers, 1)):
+                conns.append(get_connection(self.connection_string))
+            cursor = conns[0].cursor()
+            pieces = _slices(chunks, commit_every)
+            if workers > 1:
+                self._load_parallel(conns, pieces, mode, results, checkpointed)
+            else:
+                for df in pieces:
+                    results['total_records'] += len(df)
+                    self._load_frame(cursor, df, mode, results)
+                    if checkpointed:
+                        self._save_checkpoint(cursor, results, mode, 'RUNNING')
+                        with self.timed('commit'):
+                            conns[0].commit()
+            with self.timed('commit'):
+                for conn in conns:
+                    conn.commit()
+            if is_sqlite(self.connection_string) and results['successful_inserts']:
+                self._analyze_sqlite(cursor, results['successful_inserts'])
+            end_time = datetime.now()
+            results['processing_time'] = (end_time - start_time).total_seconds()
+            if checkpointed:
+                self._save_checkpoint(cursor, results, mode, 'COMPLETE')
+            # Stage metrics are written with the audit row, so the commit
+            # below is the only step they do not include
+            self._log_audit(cursor, start_time, end_time, results)
+            conns[0].commit()
+            print(f"Completed {results['successful_inserts']} inserts, {results['successful_updates']} updates, "
+                  f"{results['unchanged_records']} unchanged")
+        except Exception as e:
+            results['errors'].append(f"error: {str(e)}")
+            print(f"error: {e}")
+            # Pooled connections must not go back with open transactions
+            # and the locks they hold
+            for conn in conns:
+                _rollback(conn)
+            self._save_stage_metrics()
+            if checkpointed:
+                print(f"Committed progress is checkpointed, resume with batch ID {self.batch_id}")
+        finally:
+            for conn in conns:
+                try:
+                    conn.close()
+                except Exception as e:
+                    print(f"error closing connection: {e}")
+        results['stage_metrics'] = self.stage_metrics()
+        # Other processes pick the new audit row up as a new cache key, this
+        # also covers partial loads that committed but never wrote one
+        clear_query_cache()
+        return results
+
+    def get_checkpoint(self) -> Optional[Dict]:
+        conn = get_connection(self.connection_string)
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT source_file, load_mode, rows_committed, successful_inserts,
+                   successful_updates, unchanged_records, collapsed_records, failed_records, status
+            FROM load_checkpoint
+            WHERE batch_id = ?
+        """, self.batch_id)
+        row = cursor.fetchone()
+        conn.close()
+        if row is None:
+            return None
+        return {
+            'source_file': row.source_file,
+            'load_mode': row.load_mode,
+            'rows_committed': row.rows_committed,
+            'successful_inserts': row.successful_inserts,
+            'successful_updates': row.successful_updates,
+            'unchanged_records': row.unchanged_records,
+            'collapsed_records': row.collapsed_records,
+            'failed_records': row.failed_records,
             'errors': [],
-            'processing_time': 0
+            'status': row.status
         }
+
+    def rebuild_summary(self) -> bool:
+        # Recount customer_summary from scratch, for tables loaded before
+        # the loader maintained it or after manual edits to customer_enriched
         try:
-            conn = pyodbc.connect(self.connection_string)
+            conn = get_connection(self.connection_string)
             cursor = conn.cursor()
-            for index, row in df.iterrows():
+            cursor.execute(REBUILD_SUMMARY_SQL)
+            conn.commit()
+            conn.close()
+            clear_query_cache()
+            return True
+        except Exception as e:
+            print(f"error rebuilding customer_summary: {e}")
+            return False
+
+    def _analyze_sqlite(self, cursor, inserted):
+        # Re-analyze once the rows inserted since the last ANALYZE outnumber
+        # the rows it saw, i.e. the table has doubled. Both numbers are
+        # single-row lookups, so the check costs nothing per load and
+        # ANALYZE stays linear in the rows loaded overall
+        with self.timed('analyze'):
+            cursor.execute(SQLITE_PENDING_ROWS_SQL, inserted)
+            pending = cursor.fetchone()[0]
+            cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'sqlite_stat1'")
+            analyzed_rows = 0
+            if cursor.fetchone()[0]:
+                cursor.execute(SQLITE_ANALYZED_ROWS_SQL)
+                analyzed_rows = cursor.fetchone()[0] or 0
+            if pending > analyzed_rows:
+                cursor.execute("ANALYZE")
+                cursor.execute("UPDATE statistics_pending SET rows_inserted = 0 WHERE tbl = 'customer_enriched'")
+
+    def _save_checkpoint(self, cursor, results, mode, status):
+        with self.timed('checkpoint'):
+            cursor.execute(CHECKPOINT_SQL, (
+                self.batch_id,
+                self.source_file,
+                mode,
+                results['total_records'],
+                results['successful_inserts'],
+                results['successful_updates'],
+                results['unchanged_records'],
+                results['collapsed_records'],
+                results['failed_records'],
+                status
+            ))
+
+    def _load_frame(self, cursor, df, mode, results, stage_id=None):
+        if 'reject_reason' in df.columns:
+            rejected = df['reject_reason'].notna()
+            if rejected.any():
+                self._record_rejects(cursor, df[rejected], results)
+                df = df[~rejected]
+        with self.timed('dedup', len(df)):
+            df, duplicates = collapse_duplicates(df, self.dedup)
+        if len(duplicates):
+            if self.dedup == 'reject':
+                self._record_rejects(cursor, duplicates.assign(reject_reason='duplicate customer_id in batch'),
+                                     results)
+            else:
+                results['collapsed_records'] += len(duplicates)
+        if len(df) == 0:
+            return
+        # Summary deltas are applied in the same transaction as the rows
+        # they describe, so customer_summary always matches committed data
+        delta = Counter()
+        if mode == 'bulk':
+            self._bulk_upsert(cursor, df, results, delta)
+        elif mode == 'merge':
+            self._merge_upsert(cursor, df, results, stage_id or self.batch_id, delta)
+        elif mode == 'bcp':
+            self._merge_upsert(cursor, df, results, stage_id or self.batch_id, delta, stage=self._bulk_copy)
+        else:
+            self._row_upsert(cursor, df, results, delta)
+        with self.timed('summary'):
+            apply_summary_delta(cursor, delta)
+
+    def _load_parallel(self, conns, chunks, mode, results, checkpointed=False):
+        # Rows are hash-partitioned on customer_id and partition i always
+        # goes to connection i, so no two connections ever write the same
+        # key. Each partition commits as soon as it is done so one worker
+        # never waits on locks held by another worker's open transaction.
+        workers = len(conns)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for df in chunks:
+                results['total_records'] += len(df)
+                slots = df['customer_id'].fillna(0).astype('int64') % workers
+                futures = [
+                    pool.submit(self._load_partition, conns[slot], part, mode)
+                    for slot, part in df.groupby(slots)
+                ]
+                for future in futures:
+                    _merge_results(results, future.result())
+                if checkpointed:
+                    self._save_checkpoint(conns[0].cursor(), results, mode, 'RUNNING')
+                    with self.timed('commit'):
+                        conns[0].commit()
+
+    def _load_partition(self, conn, df, mode) -> Dict:
+        partial = _new_results(self.batch_id)
+        cursor = conn.cursor()
+        self._load_frame(cursor, df, mode, partial, stage_id=str(uuid.uuid4()))
+        with self.timed('commit'):
+            conn.commit()
+        return partial
+    
+    def _record_rejects(self, cursor, rejected, results):
+        results['failed_records'] += len(rejected)
+        results['errors'].extend(
+            f"customer {customer_id}: {reason}"
+            for customer_id, reason in zip(rejected['customer_id'], rejected['reject_reason'])
+        )
+        rows = [dict(zip(COLUMNS, params)) for params in _params(rejected, COLUMNS)]
+        self._write_rejects(cursor, zip(rows, rejected['reject_reason']))
+
+    def _write_rejects(self, cursor, rejects):
+        # Keeps the rejected rows and their errors in load_rejects so they
+        # can be fixed and reloaded; losing them must not fail the load
+        params = [
+            (self.batch_id, row['customer_id'], str(reason)[:1000], json.dumps(row, default=str))
+            for row, reason in rejects
+        ]
+        if not params:
+            return
+        try:
+            with self.timed('rejects', len(params)):
+                cursor.executemany(REJECT_SQL, params)
+        except Exception as e:
+            print(f"Could not write {len(params)} rejected rows to load_rejects: {e}")
+
+    def _row_upsert(self, cursor, df, results, delta):
+        # Per-row timings add up locally and are recorded once per frame,
+        # timed() around every row would cost a quarter of the load
+        check_sql = f"SELECT row_hash, {', '.join(SUMMARY_COLUMNS)} FROM customer_enriched WHERE customer_id = ?"
+        failed = []
+        timings = {stage: [0.0, 0] for stage in ('existence_check', 'update', 'insert')}
+        try:
+            for params in _params(df, COLUMNS):
+                row = dict(zip(COLUMNS, params))
                 try:
-                    check_sql = "SELECT COUNT(*) FROM customer_enriched WHERE customer_id = ?"
+                    start = time.perf_counter()
                     cursor.execute(check_sql, row['customer_id'])
-                    exists = cursor.fetchone()[0] > 0
-                    if exists:
+                    existing = cursor.fetchone()
+                    checked = time.perf_counter()
+                    timings['existence_check'][0] += checked - start
+                    timings['existence_check'][1] += 1
+                    if existing is not None and existing[0] == row['row_hash']:
+                        results['unchanged_records'] += 1
+                    elif existing is not None:
                         self._update_record(cursor, row)
+                        timings['update'][0] += time.perf_counter() - checked
+                        timings['update'][1] += 1
                         results['successful_updates'] += 1
+                        add_row_summary(delta, dict(zip(SUMMARY_COLUMNS, existing[1:])), -1)
+                        add_row_summary(delta, row)
                     else:
                         self._insert_record(cursor, row)
+                        timings['insert'][0] += time.perf_counter() - checked
+                        timings['insert'][1] += 1
                         results['successful_inserts'] += 1
+                        add_row_summary(delta, row)
                 except Exception as e:
                     error_msg = f"customer {row['customer_id']}: {str(e)}"
                     results['errors'].append(error_msg)
-                    results['failed_records'] += 1       
-            conn.commit()
-            end_time = datetime.now()
-            results['processing_time'] = (end_time - start_time).total_seconds()
-            self._log_audit(cursor, start_time, end_time, results)
-            conn.commit()
-            conn.close()
-            print(f"Completed {results['successful_inserts']} inserts, {results['successful_updates']} updates")
+                    results['failed_records'] += 1
+                    failed.append((row, str(e)))
+        finally:
+            for stage, (seconds, rows) in timings.items():
+                if rows:
+                    self.record_stage(stage, seconds, rows)
+        self._write_rejects(cursor, failed)
+
+    def _bulk_upsert(self, cursor, df, results, delta):
+        # One key lookup plus one array-bound INSERT and UPDATE per chunk.
+        # A chunk that fails is bisected down to the failing rows, so
+        # failures are still attributed to a customer_id without falling
+        # back to a round trip per row.
+        cursor.fast_executemany = True
+        for start in range(0, len(df), self.chunk_size):
+            chunk = df.iloc[start:start + self.chunk_size]
+            with self.timed('existence_check', len(chunk)):
+                existing = self._existing_rows(cursor, chunk['customer_id'])
+            hashes = {customer_id: row[0] for customer_id, row in existing.items()}
+            stored = chunk['customer_id'].map(pd.Series(hashes, dtype='Int64'))
+            is_existing = chunk['customer_id'].isin(existing.keys())
+            is_unchanged = (stored == chunk['row_hash']).fillna(False).astype(bool)
+            results['unchanged_records'] += int(is_unchanged.sum())
+
+            changed = chunk[~is_unchanged]
+            is_insert = ~is_existing[~is_unchanged].to_numpy(dtype=bool)
+            applied = self._bisect(cursor, changed, is_insert, results)
+            if not applied.all():
+                print(f"Isolated {int((~applied).sum())} failing rows in bulk chunk at row {start}")
+            results['successful_inserts'] += int((applied & is_insert).sum())
+            results['successful_updates'] += int((applied & ~is_insert).sum())
+
+            updates = changed[applied & ~is_insert]
+            old = pd.DataFrame(
+                [tuple(existing[customer_id][1:]) for customer_id in updates['customer_id']],
+                columns=SUMMARY_COLUMNS
+            )
+            add_summary_counts(delta, old, -1)
+            add_summary_counts(delta, changed[applied])
+
+    def _bisect(self, cursor, rows, is_insert, results) -> np.ndarray:
+        # Returns which rows were applied. A failed batch is rolled back to
+        # its savepoint and split in half until each failure is one row, so
+        # k bad rows cost O(k log n) statements instead of n.
+        if len(rows) == 0:
+            return np.zeros(0, dtype=bool)
+        try:
+            cursor.execute("SAVE TRANSACTION bulk_chunk")
+            if is_insert.any():
+                with self.timed('insert', int(is_insert.sum())):
+                    cursor.executemany(INSERT_SQL, _params(rows[is_insert], COLUMNS))
+            if not is_insert.all():
+                with self.timed('update', int((~is_insert).sum())):
+                    cursor.executemany(UPDATE_SQL, _params(rows[~is_insert], UPDATE_COLUMNS))
+            return np.ones(len(rows), dtype=bool)
         except Exception as e:
-            results['errors'].append(f"error: {str(e)}")
-            print(f"error: {e}")
-        return results
-    
+            cursor.execute("IF @@TRANCOUNT > 0 ROLLBACK TRANSACTION bulk_chunk")
+            if len(rows) == 1:
+                self._record_rejects(cursor, rows.assign(reject_reason=str(e)), results)
+                return np.zeros(1, dtype=bool)
+        middle = len(rows) // 2
+        return np.concatenate([
+            self._bisect(cursor, rows.iloc[:middle], is_insert[:middle], results),
+            self._bisect(cursor, rows.iloc[middle:], is_insert[middle:], results),
+        ])
+
+    def _merge_upsert(self, cursor, df, results, stage_id, delta, stage=None):
+        # Stage the batch (array-bound inserts by default, see _bulk_copy),
+        # then let the server reconcile it in a single MERGE. If the MERGE
+        # fails the batch goes through the bulk path, which bisects it to
+        # attribute the failures.
+        cursor.fast_executemany = True
+        try:
+            with self.timed('stage', len(df)):
+                (stage or self._stage_rows)(cursor, df, stage_id)
+            # The delta has to be read before the MERGE overwrites the old values
+            with self.timed('summary'):
+                cursor.execute(STAGED_SUMMARY_DELTA_SQL, stage_id)
+                staged_delta = Counter({tuple(row[:3]): row[3] for row in cursor.fetchall()})
+            with self.timed('merge', len(df)):
+                cursor.execute(MERGE_SQL, stage_id)
+                inserted, updated = cursor.fetchone()
+            results['successful_inserts'] += inserted
+            results['successful_updates'] += updated
+            results['unchanged_records'] += len(df) - inserted - updated
+        except Exception as e:
+            print(f"MERGE load failed, retrying in bulk mode: {e}")
+            cursor.execute(CLEAR_STAGE_SQL, stage_id)
+            self._bulk_upsert(cursor, df, results, delta)
+            return
+        cursor.execute(CLEAR_STAGE_SQL, stage_id)
+        delta.update(staged_delta)
+
+    def _stage_rows(self, cursor, df, stage_id):
+        for start in range(0, len(df), self.chunk_size):
+            chunk = df.iloc[start:start + self.chunk_size].assign(batch_id=stage_id)
+            cursor.executemany(STAGE_SQL, _params(chunk, STAGE_COLUMNS))
+
+    def _bulk_copy(self, cursor, df, stage_id):
+        # The file is written a chunk at a time so a multi-GB frame is never
+        # rendered as one string, and removed once the server has read it
+        stage_dir = os.getenv('BULK_STAGE_DIR')
+        server_dir = os.getenv('BULK_STAGE_SERVER_DIR', stage_dir).rstrip('/\\')
+        file_name = f"customer_enriched_{stage_id}.csv"
+        local_path = Path(stage_dir) / file_name
+        try:
+            with open(local_path, 'w', encoding='utf-8', newline='') as f:
+                for start in range(0, len(df), self.chunk_size):
+                    chunk = df.iloc[start:start + self.chunk_size].assign(batch_id=stage_id)[STAGE_COLUMNS]
+                    # BIT columns need 1/0, not True/False
+                    flags = chunk.select_dtypes(include=['bool', 'boolean']).columns
+                    chunk = chunk.astype({column: 'Int8' for column in flags})
+                    chunk.to_csv(f, header=False, index=False, lineterminator='\n',
+                                 date_format='%Y-%m-%d %H:%M:%S.%f')
+            server_path = f"{server_dir}/{file_name}".replace("'", "''")
+            cursor.execute(BULK_INSERT_SQL.format(path=server_path))
+        finally:
+            local_path.unlink(missing_ok=True)
+
+    def _existing_rows(self, cursor, customer_ids) -> Dict:
+        ids = [int(customer_id) for customer_id in customer_ids.unique()]
+        existing = {}
+        for start in range(0, len(ids), KEY_LOOKUP_SIZE):
+            batch = ids[start:start + KEY_LOOKUP_SIZE]
+            placeholders = ', '.join('?' * len(batch))
+            cursor.execute(
+                f"SELECT customer_id, row_hash, {', '.join(SUMMARY_COLUMNS)} "
+                f"FROM customer_enriched WHERE customer_id IN ({placeholders})",
+                batch
+            )
+            existing.update((row[0], row[1:]) for row in cursor.fetchall())
+        return existing
+
     def _update_record(self, cursor, row):
-        update_sql = """
-        UPDATE customer_enriched SET
-            first_name = ?, last_name = ?, email = ?, phone = ?, postcode = ?,
-            region = ?, country = ?, district = ?, longitude = ?, latitude = ?, geo_enriched = ?,
-            company = ?, company_size = ?, industry = ?, annual_revenue = ?, is_business = ?,
-            calculated_risk = ?, risk_score_numeric = ?, risk_factors = ?,
-            status = ?, processed_date = ?, data_source = ?, enrichment_status = ?,
-            modified_date = GETDATE()
-        WHERE customer_id = ?
-        """
-        
-        cursor.execute(update_sql, (
-            row['first_name'], row['last_name'], row['email'],
-            row['phone'], row['postcode'],
-            row['region'], row['country'], row['district'],
-            row['longitude'], row['latitude'], row['geo_enriched'],
-            row['company'], row['company_size'], row['industry'],
-            row['annual_revenue'], row['is_business'],
-            row['calculated_risk'], row['risk_score_numeric'], row['risk_factors'],
-            row['status'], row['processed_date'], row['data_source'],
-            row['enrichment_status'], row['customer_id']
-        ))
+        cursor.execute(UPDATE_SQL, tuple(row[column] for column in UPDATE_COLUMNS))
     
     def _insert_record(self, cursor, row):
-        insert_sql = """
-        INSERT INTO customer_enriched (
-            customer_id, first_name, last_name, email, phone, postcode,
-            region, country, district, longitude, latitude, geo_enriched,
-            company, company_size, industry, annual_revenue, is_business,
-            calculated_risk, risk_score_numeric, risk_factors,
-            status, processed_date, data_source, enrichment_status
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
-        
-        cursor.execute(insert_sql, (
-            row['customer_id'], row['first_name'], row['last_name'],
-            row['email'], row['phone'], row['postcode'],
-            row['region'], row['country'], row['district'],
-            row['longitude'], row['latitude'], row['geo_enriched'],
-            row['company'], row['company_size'], row['industry'],
-            row['annual_revenue'], row['is_business'],
-            row['calculated_risk'], row['risk_score_numeric'], row['risk_factors'],
-            row['status'], row['processed_date'], row['data_source'],
-            row['enrichment_status']
-        ))
+        cursor.execute(INSERT_SQL, tuple(row[column] for column in COLUMNS))
     
     def _log_audit(self, cursor, start_time, end_time, results):
         audit_sql = """
@@ -107,49 +735,250 @@ class DatabaseLoader:
         ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
         error_summary = '; '.join(results['errors'][:5]) if results['errors'] else None
-        successful = results['successful_inserts'] + results['successful_updates']
-        cursor.execute(audit_sql, (
-            self.batch_id,
-            'UPSERT',
-            results['total_records'],
-            successful,
-            results['failed_records'],
-            start_time,
-            end_time,
-            error_summary,
-            'v1.0'
-        ))
-
-def load_csv(csv_path: str) -> pd.DataFrame:
+        # A collapsed row was superseded by a later row for the same key
+        successful = (results['successful_inserts'] + results['successful_updates']
+                      + results['unchanged_records'] + results['collapsed_records'])
+        with self.timed('audit', 1):
+            cursor.execute(audit_sql, (
+                self.batch_id,
+                'UPSERT',
+                results['total_records'],
+                successful,
+                results['failed_records'],
+                start_time,
+                end_time,
+                error_summary,
+                'v1.0'
+            ))
+        self._write_stage_metrics(cursor)
+
+    def _write_stage_metrics(self, cursor):
+        cursor.executemany(STAGE_METRICS_SQL, [
+            (self.batch_id, stage, metric['seconds'], metric['rows'], metric['calls'],
+             metric['rows_per_sec'], metric['peak_memory_mb'])
+            for stage, metric in self.stage_metrics().items()
+        ])
+
+    def _save_stage_metrics(self):
+        # A failed load writes no audit row, its timings are kept anyway on
+        # a connection of their own, since the load's may be broken
+        if not self._stages:
+            return
+        try:
+            conn = get_connection(self.connection_string)
+            try:
+                self._write_stage_metrics(conn.cursor())
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"Could not write stage metrics for batch {self.batch_id}: {e}")
+
+def _skip_rows(skip: int):
+    # Header is line 0, so data row n sits on line n
+    return (lambda line: 0 < line <= skip) if skip else None
+
+def load_csv(csv_path: str, skip: int = 0) -> pd.DataFrame:
     try:
-        df = pd.read_csv(csv_path)
+        df = pd.read_csv(csv_path, skiprows=_skip_rows(skip), dtype=CSV_DTYPES)
         print(f"Loaded {len(df)} records from {Path(csv_path).name}")
         return df
     except Exception as e:
         print(f"Failed to load CSV: {e}")
         return None
 
+def load_csv_chunks(csv_path: str, chunksize: int, skip: int = 0) -> Optional[Iterator[pd.DataFrame]]:
+    try:
+        reader = pd.read_csv(csv_path, chunksize=chunksize, skiprows=_skip_rows(skip),
+                             dtype=CSV_DTYPES)
+        print(f"Streaming {Path(csv_path).name} in chunks of {chunksize} records")
+        return reader
+    except Exception as e:
+        print(f"Failed to load CSV: {e}")
+        return None
+
+def _prepared_chunks(reader, timed) -> Iterator[pd.DataFrame]:
+    with reader:
+        chunks = iter(reader)
+        while True:
+            with timed('csv_parse') as event:
+                chunk = next(chunks, None)
+                event['rows'] = 0 if chunk is None else len(chunk)
+            if chunk is None:
+                return
+            with timed('prepare', len(chunk)):
+                chunk = prepare_data(chunk)
+            yield chunk
+
+def row_hashes(df: pd.DataFrame) -> pd.Series:
+    hashes = pd.util.hash_pandas_object(df[HASH_COLUMNS].astype(str), index=False)
+    # Stored as a signed BIGINT
+    return pd.Series(hashes.values.view('int64'), index=df.index)
+
+def collapse_duplicates(df: pd.DataFrame, policy: str = 'last'):
+    # Returns (one row per customer_id, the other rows). Under 'reject'
+    # every row of a repeated key is returned as the second frame.
+    keys = df['customer_id']
+    duplicated = keys.duplicated(keep=False) & keys.notna()
+    if not duplicated.any():
+        return df, df.iloc[0:0]
+    if policy == 'reject':
+        return df[~duplicated], df[duplicated]
+    if policy == 'processed_date':
+        # Stable sort, so rows with the same date still resolve by file order
+        order = df['source_processed_date'].reset_index(drop=True).sort_values(
+            kind='stable', na_position='first').index.to_numpy()
+    else:
+        order = np.arange(len(df))
+    ordered = keys.iloc[order]
+    latest = (~ordered.duplicated(keep='last') | ordered.isna()).to_numpy()
+    keep = np.zeros(len(df), dtype=bool)
+    keep[order[latest]] = True
+    return df[keep], df[~keep]
+
 def prepare_data(df: pd.DataFrame) -> pd.DataFrame:
+    df = apply_schema(df)
+    # Kept for the processed_date dedup policy, processed_date itself is
+    # restamped with the load time below
+    if 'processed_date' in df.columns:
+        df['source_processed_date'] = pd.to_datetime(df['processed_date'], errors='coerce')
+    else:
+        df['source_processed_date'] = pd.NaT
     df['processed_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     df['data_source'] = 'ETL_Pipeline_v1'
     if 'enrichment_status' not in df.columns:
         df['enrichment_status'] = 'Fully Enriched'
     if 'geo_enriched' in df.columns:
-        df['geo_enriched'] = df['geo_enriched'].astype(int)
+        df['geo_enriched'] = df['geo_enriched'].fillna(0).astype(int)
     if 'is_business' in df.columns:
-        df['is_business'] = df['is_business'].astype(int)
+        df['is_business'] = df['is_business'].fillna(0).astype(int)
+    df['row_hash'] = row_hashes(df)
     return df
 
 
-def insert_data(connection_string: str, csv_path: str) -> Dict:
-    df = load_csv(csv_path)
+def _open_prepared(loader: 'DatabaseLoader', csv_path: str, chunksize: Optional[int], skip: int = 0):
+    # Parse and prepare time is recorded on the loader that applies the rows
+    if chunksize:
+        reader = load_csv_chunks(csv_path, chunksize, skip)
+        return None if reader is None else _prepared_chunks(reader, loader.timed)
+    with loader.timed('csv_parse') as event:
+        df = load_csv(csv_path, skip)
+        event['rows'] = 0 if df is None else len(df)
     if df is None:
+        return None
+    with loader.timed('prepare', len(df)):
+        return [prepare_data(df)]
+
+
+def insert_data(connection_string: str, csv_path: str, mode: str = 'row',
+                chunksize: Optional[int] = None, workers: int = 1,
+                commit_every: int = COMMIT_EVERY, dedup: str = 'last') -> Dict:
+    # Duplicate keys are collapsed per loaded frame; with chunksize or
+    # commit_every a key repeated across chunks is still written per chunk
+    loader = DatabaseLoader(connection_string, dedup=dedup)
+    chunks = _open_prepared(loader, csv_path, chunksize)
+    if chunks is None:
         return {'success': False, 'error': 'Failed to load CSV'}
-    df = prepare_data(df)
-    loader = DatabaseLoader(connection_string)
-    results = loader.load_data(df)
-    results['success'] = results['failed_records'] == 0
+    results = loader.load_chunks(chunks, mode=mode, workers=workers,
+                                 commit_every=commit_every, source_file=str(csv_path))
+    results['success'] = results['failed_records'] == 0 and not results['errors']
     return results
 
-def upsert_data(connection_string: str, csv_path: str) -> Dict:
-    return insert_data(connection_string, csv_path)
+def upsert_data(connection_string: str, csv_path: str, mode: str = 'row',
+                chunksize: Optional[int] = None, workers: int = 1,
+                commit_every: int = COMMIT_EVERY, dedup: str = 'last') -> Dict:
+    return insert_data(connection_string, csv_path, mode=mode, chunksize=chunksize,
+                       workers=workers, commit_every=commit_every, dedup=dedup)
+
+def resume_batch(connection_string: str, batch_id: str, chunksize: Optional[int] = None,
+                 workers: int = 1, commit_every: int = COMMIT_EVERY, dedup: str = 'last') -> Dict:
+    loader = DatabaseLoader(connection_string, batch_id=batch_id, dedup=dedup)
+    checkpoint = loader.get_checkpoint()
+    if checkpoint is None:
+        return {'success': False, 'error': f'No checkpoint found for batch {batch_id}'}
+    if checkpoint['status'] == 'COMPLETE':
+        print(f"Batch {batch_id} already completed, nothing to resume")
+        results = _new_results(batch_id)
+        results['success'] = True
+        return results
+    print(f"Resuming batch {batch_id} after {checkpoint['rows_committed']} committed records")
+    chunks = _open_prepared(loader, checkpoint['source_file'], chunksize, checkpoint['rows_committed'])
+    if chunks is None:
+        return {'success': False, 'error': 'Failed to load CSV'}
+    results = loader.load_chunks(chunks, mode=checkpoint['load_mode'], workers=workers,
+                                 commit_every=commit_every,
+                                 source_file=checkpoint['source_file'],
+                                 resume_from=checkpoint)
+    results['success'] = results['failed_records'] == 0 and not results['errors']
+    return results
+
+def discover_files(pattern: str = 'data/*.csv') -> List[Path]:
+    # Files apply in name order, so drops should carry a sortable date or
+    # sequence (customers_20240105.csv) and a later drop's updates win.
+    # Modification times only break ties: cp and rsync without -p reset
+    # them, and fixing a bad file would move it behind newer ones.
+    paths = [Path(path) for path in glob.glob(pattern)]
+    return sorted(paths, key=lambda path: (path.name, path.stat().st_mtime, str(path)))
+
+def _prepare_file(csv_path: str):
+    # Runs in a worker process, so the timings travel back with the frame
+    start = time.perf_counter()
+    df = load_csv(csv_path)
+    timings = {'csv_parse': time.perf_counter() - start}
+    if df is None:
+        return None, timings
+    start = time.perf_counter()
+    df = prepare_data(df)
+    timings['prepare'] = time.perf_counter() - start
+    return df, timings
+
+def ingest_directory(connection_string: str, pattern: str = 'data/*.csv', mode: str = 'row',
+                     workers: int = 1, parse_workers: Optional[int] = None,
+                     commit_every: int = COMMIT_EVERY, dedup: str = 'last') -> Dict:
+    # Files are parsed and prepared in a process pool but applied one at a
+    # time in discover_files order, each as its own batch with its own
+    # audit row. Only a few prepared files are held ahead of the apply,
+    # and a file that fails to parse or a load that aborts stops the run
+    # so no newer file overtakes it.
+    files = discover_files(pattern)
+    summary = {'pattern': pattern, 'files': [], 'success': True}
+    if not files:
+        print(f"No CSV files match {pattern}")
+        return summary
+    print(f"Ingesting {len(files)} files matching {pattern}")
+
+    parse_workers = parse_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=parse_workers) as pool:
+        queue = iter(files)
+        pending = deque(
+            (path, pool.submit(_prepare_file, str(path)))
+            for path in itertools.islice(queue, 2 * parse_workers)
+        )
+        while pending:
+            path, future = pending.popleft()
+            next_path = next(queue, None)
+            if next_path is not None:
+                pending.append((next_path, pool.submit(_prepare_file, str(next_path))))
+            try:
+                df, timings = future.result()
+            except Exception as e:
+                df = None
+                print(f"Failed to prepare {path.name}: {e}")
+            if df is None:
+                results = {'success': False, 'error': f'Failed to load CSV {path}'}
+            else:
+                loader = DatabaseLoader(connection_string, dedup=dedup)
+                for stage, seconds in timings.items():
+                    loader.record_stage(stage, seconds, len(df))
+                results = loader.load_chunks([df], mode=mode, workers=workers,
+                                             commit_every=commit_every, source_file=str(path))
+                results['success'] = results['failed_records'] == 0 and not results['errors']
+            results['file'] = str(path)
+            summary['files'].append(results)
+            summary['success'] = summary['success'] and results['success']
+            if df is None or any(error.startswith('error: ') for error in results.get('errors', [])):
+                print(f"Stopping ingest at {path.name}, later files are not applied")
+                for path, future in pending:
+                    future.cancel()
+                break
+    return summary
@@ -0,0 +1,81 @@
+import pandas as pd
+
+
+# Mirrors dbo.customer_enriched in database-setup/02_setup_tables.sql
+# column: (pandas dtype, max NVARCHAR length, nullable)
+SCHEMA = {
+    'customer_id': ('Int64', None, False),
+    'first_name': ('string', 50, False),
+    'last_name': ('string', 50, False),
+    'email': ('string', 100, False),
+    'phone': ('string', 20, True),
+    'postcode': ('string', 10, True),
+    'region': ('category', 50, True),
+    'country': ('category', 50, True),
+    'district': ('string', 50, True),
+    'longitude': ('Float64', None, True),
+    'latitude': ('Float64', None, True),
+    'geo_enriched': ('Int8', None, True),
+    'company': ('string', 100, True),
+    'company_size': ('category', 50, True),
+    'industry': ('category', 50, True),
+    'annual_revenue': ('string', 50, True),
+    'is_business': ('Int8', None, True),
+    'calculated_risk': ('category', 20, True),
+    'risk_score_numeric': ('Int32', None, True),
+    'risk_factors': ('string', 500, True),
+    'status': ('category', 20, True),
+    'processed_date': ('string', None, True),
+    'data_source': ('string', 50, True),
+    'enrichment_status': ('category', 50, True),
+}
+
+NUMERIC_DTYPES = ('Int64', 'Int32', 'Int8', 'Float64')
+INTEGER_DTYPES = ('Int64', 'Int32', 'Int8')
+# DECIMAL(10,7) leaves three digits before the point
+DECIMAL_LIMIT = 1000
+
+# Numeric columns are read as text and coerced afterwards so one bad
+# value rejects its row instead of failing the whole read
+CSV_DTYPES = {
+    column: 'string' if dtype in NUMERIC_DTYPES else dtype
+    for column, (dtype, _, _) in SCHEMA.items()
+}
+
+
+def _flag(reasons: pd.Series, mask: pd.Series, message: str) -> pd.Series:
+    return reasons.mask(mask & reasons.isna(), message)
+
+
+def _lengths(series: pd.Series) -> pd.Series:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        lengths = pd.Series(series.cat.categories.astype(str).str.len(), dtype='Int64')
+        return series.cat.codes.map(lengths).astype('Int64')
+    return series.astype('string').str.len()
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    reasons = pd.Series(pd.NA, index=df.index, dtype='string')
+    for column, (dtype, max_length, nullable) in SCHEMA.items():
+        if column not in df.columns:
+            continue
+        series = df[column]
+        if dtype in NUMERIC_DTYPES:
+            coerced = pd.to_numeric(series, errors='coerce')
+            invalid = series.notna() & coerced.isna()
+            if dtype in INTEGER_DTYPES:
+                invalid |= (coerced % 1).fillna(0) != 0
+            else:
+                invalid |= coerced.abs().fillna(0) >= DECIMAL_LIMIT
+            reasons = _flag(reasons, invalid, f"{column}: invalid {dtype} value")
+            df[column] = coerced.mask(invalid).astype(dtype)
+        else:
+            if dtype != series.dtype:
+                df[column] = series.astype(dtype)
+            if max_length:
+                too_long = (_lengths(df[column]) > max_length).fillna(False)
+                reasons = _flag(reasons, too_long, f"{column}: longer than {max_length} characters")
+        if not nullable:
+            reasons = _flag(reasons, df[column].isna(), f"{column}: missing required value")
+    df['reject_reason'] = reasons
+    return df
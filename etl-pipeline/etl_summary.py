@@ -0,0 +1,198 @@
+import os
+import sys
+from collections import Counter
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from sqlite_backend import register_statements
+
+
+# Pre-aggregated counts kept in dbo.customer_summary for the reports.
+# dimension: (key1 column, optional key2 column)
+SUMMARY_DIMENSIONS = {
+    'is_business': ('is_business',),
+    'geo_enriched': ('geo_enriched',),
+    'country': ('country',),
+    'region': ('region',),
+    'district': ('district',),
+    'company_size': ('is_business', 'company_size'),
+    'industry': ('industry',),
+    'risk': ('calculated_risk', 'risk_score_numeric'),
+    'risk_by_type': ('is_business', 'calculated_risk'),
+    'status': ('status',),
+    'enrichment_status': ('enrichment_status',),
+    'data_source': ('data_source',),
+}
+
+SUMMARY_COLUMNS = sorted({column for columns in SUMMARY_DIMENSIONS.values() for column in columns})
+# Keys are stored as NVARCHAR, these need to render as '1' / '5' not 'True' / '5.0'
+INTEGER_COLUMNS = ('is_business', 'geo_enriched', 'risk_score_numeric')
+
+
+def _sql_key(alias, column):
+    if column is None:
+        return "CAST(NULL AS NVARCHAR(200))"
+    return f"CAST({alias}.{column} AS NVARCHAR(200))"
+
+
+def _sql_keys(alias):
+    return [
+        (dimension, _sql_key(alias, columns[0]), _sql_key(alias, columns[1] if len(columns) > 1 else None))
+        for dimension, columns in SUMMARY_DIMENSIONS.items()
+    ]
+
+
+# HOLDLOCK keeps the key range locked from the match to the insert, so two
+# workers adding the same new key cannot both miss it and both insert
+APPLY_SUMMARY_SQL = """
+MERGE customer_summary WITH (HOLDLOCK) AS target
+USING (SELECT ? AS dimension, ? AS key1, ? AS key2, ? AS delta) AS source
+ON target.dimension = source.dimension
+   AND (target.key1 = source.key1 OR (target.key1 IS NULL AND source.key1 IS NULL))
+   AND (target.key2 = source.key2 OR (target.key2 IS NULL AND source.key2 IS NULL))
+WHEN MATCHED AND target.customer_count + source.delta = 0 THEN DELETE
+WHEN MATCHED THEN UPDATE SET customer_count = target.customer_count + source.delta
+WHEN NOT MATCHED THEN
+    INSERT (dimension, key1, key2, customer_count)
+    VALUES (source.dimension, source.key1, source.key2, source.delta);
+"""
+
+_new_values = ',\n        '.join(
+    f"('{dimension}', {key1}, {key2}, 1)" for dimension, key1, key2 in _sql_keys('s')
+)
+_old_values = ',\n        '.join(
+    f"('{dimension}', {key1}, {key2}, CASE WHEN e.customer_id IS NULL THEN 0 ELSE -1 END)"
+    for dimension, key1, key2 in _sql_keys('e')
+)
+
+# Delta a staged batch will apply, computed before the MERGE overwrites
+# the old values. Unchanged rows (same row_hash) contribute nothing.
+STAGED_SUMMARY_DELTA_SQL = f"""
+SELECT d.dimension, d.key1, d.key2, SUM(d.delta) AS delta
+FROM customer_enriched_staging s
+LEFT JOIN customer_enriched e ON e.customer_id = s.customer_id
+CROSS APPLY (VALUES
+        {_new_values},
+        {_old_values}
+) AS d(dimension, key1, key2, delta)
+WHERE s.batch_id = ?
+  AND (e.customer_id IS NULL OR e.row_hash IS NULL OR e.row_hash <> s.row_hash)
+GROUP BY d.dimension, d.key1, d.key2
+HAVING SUM(d.delta) <> 0
+"""
+
+_all_values = ',\n        '.join(
+    f"('{dimension}', {key1}, {key2})" for dimension, key1, key2 in _sql_keys('e')
+)
+
+REBUILD_SUMMARY_SQL = f"""
+DELETE FROM customer_summary;
+INSERT INTO customer_summary (dimension, key1, key2, customer_count)
+SELECT d.dimension, d.key1, d.key2, COUNT(*)
+FROM customer_enriched e
+CROSS APPLY (VALUES
+        {_all_values}
+) AS d(dimension, key1, key2)
+GROUP BY d.dimension, d.key1, d.key2;
+"""
+
+# SQLite versions: no MERGE or CROSS APPLY, so an upsert against the
+# IFNULL'd unique index (a trigger drops rows that reach 0) and UNION ALL
+register_statements(APPLY_SUMMARY_SQL, """
+INSERT INTO customer_summary (dimension, key1, key2, customer_count)
+VALUES (?, ?, ?, ?)
+ON CONFLICT (dimension, IFNULL(key1, char(0)), IFNULL(key2, char(0))) DO UPDATE SET
+    customer_count = customer_count + excluded.customer_count
+""")
+
+_sqlite_new = '\n    UNION ALL\n    '.join(
+    f"SELECT '{dimension}' AS dimension, {key1} AS key1, {key2} AS key2, 1 AS delta "
+    f"FROM changed c JOIN customer_enriched_staging s ON s.rowid = c.staged_rowid"
+    for dimension, key1, key2 in _sql_keys('s')
+)
+_sqlite_old = '\n    UNION ALL\n    '.join(
+    f"SELECT '{dimension}' AS dimension, {key1} AS key1, {key2} AS key2, -1 AS delta "
+    f"FROM changed c JOIN customer_enriched e ON e.customer_id = c.existing_id"
+    for dimension, key1, key2 in _sql_keys('e')
+)
+register_statements(STAGED_SUMMARY_DELTA_SQL, f"""
+WITH changed AS MATERIALIZED (
+    SELECT s.rowid AS staged_rowid, e.customer_id AS existing_id
+    FROM customer_enriched_staging s
+    LEFT JOIN customer_enriched e ON e.customer_id = s.customer_id
+    WHERE s.batch_id = ?
+      AND (e.customer_id IS NULL OR e.row_hash IS NULL OR e.row_hash <> s.row_hash)
+)
+SELECT dimension, key1, key2, SUM(delta) AS delta
+FROM (
+    {_sqlite_new}
+    UNION ALL
+    {_sqlite_old}
+)
+GROUP BY dimension, key1, key2
+HAVING SUM(delta) <> 0
+""")
+
+_sqlite_all = '\n    UNION ALL\n    '.join(
+    f"SELECT '{dimension}' AS dimension, {key1} AS key1, {key2} AS key2 FROM customer_enriched e"
+    for dimension, key1, key2 in _sql_keys('e')
+)
+register_statements(
+    REBUILD_SUMMARY_SQL,
+    "DELETE FROM customer_summary",
+    f"""
+INSERT INTO customer_summary (dimension, key1, key2, customer_count)
+SELECT dimension, key1, key2, COUNT(*)
+FROM (
+    {_sqlite_all}
+)
+GROUP BY dimension, key1, key2
+""")
+
+
+def _summary_keys(df: pd.DataFrame) -> pd.DataFrame:
+    keys = pd.DataFrame(index=df.index)
+    for column in SUMMARY_COLUMNS:
+        series = df[column]
+        if column in INTEGER_COLUMNS:
+            series = pd.to_numeric(series).astype('Int64')
+        keys[column] = series.astype('string')
+    return keys
+
+
+def add_summary_counts(delta: Counter, df: pd.DataFrame, sign: int = 1):
+    if df.empty:
+        return
+    keys = _summary_keys(df)
+    for dimension, columns in SUMMARY_DIMENSIONS.items():
+        counts = keys.groupby(list(columns), dropna=False).size()
+        for key, count in counts.items():
+            key = key if isinstance(key, tuple) else (key,)
+            key = tuple(None if pd.isna(value) else value for value in key)
+            delta[(dimension,) + key + (None,) * (2 - len(key))] += sign * int(count)
+
+
+def _key(value):
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return str(int(value))
+    return str(value)
+
+
+def add_row_summary(delta: Counter, row: dict, sign: int = 1):
+    for dimension, columns in SUMMARY_DIMENSIONS.items():
+        key = tuple(_key(row[column]) for column in columns)
+        delta[(dimension,) + key + (None,) * (2 - len(key))] += sign
+
+
+def apply_summary_delta(cursor, delta: Counter):
+    # Sorted so concurrent loaders always lock summary rows in the same
+    # order and cannot deadlock each other
+    rows = sorted(
+        (key + (count,) for key, count in delta.items() if count),
+        key=lambda row: tuple('' if value is None else value for value in row[:3])
+    )
+    if rows:
+        cursor.executemany(APPLY_SUMMARY_SQL, [list(row) for row in rows])
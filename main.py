@@ -1,40 +1,47 @@
 import os
 import sys
+import json
+import argparse
+import importlib
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
 from dotenv import load_dotenv
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
-sys.path.append(os.path.join(os.path.dirname(__file__), 'etl-pipeline'))
-from etl_pipe import insert_data, upsert_data
+# Only light modules are imported up front. etl_pipe, the validators and
+# the reports pull in pandas/pyodbc/SQLAlchemy, so each command imports
+# what it needs when it runs (see benchmarks/bench_startup.py).
+for folder in ('etl-pipeline', 'data-validation', 'output-scripts'):
+    sys.path.append(os.path.join(os.path.dirname(__file__), folder))
 
-sys.path.append(os.path.join(os.path.dirname(__file__), 'data-validation'))
-from validate_recordCount import validate_recordCount
-from validate_completness import validate_completeness
-from validate_riskDistribution import validate_riskDistribution
-from validate_geoDistribution import validate_geoDistribution
-from validate_auditTrailVerification import validate_auditTrailVerification
-
-sys.path.append(os.path.join(os.path.dirname(__file__), 'output-scripts'))
-from report_customer_demographics import generate_customer_demographics_report
-from report_risk_analysis import generate_risk_analysis_report
-from report_geographic_distribution import generate_geographic_distribution_report
-from report_data_quality import generate_data_quality_report
-from report_enrichment_status import generate_enrichment_status_report
+from connection_manager import (enable_profiling, get_connection_string, pool_capacity, report_profile,
+                                submit_queries)
+from etl_options import COMMIT_EVERY, DEDUP_POLICIES, LOAD_MODES
+from report_export import EXPORT_FORMATS, json_default
 
 load_dotenv()
 
+REPORT_WORKERS = int(os.getenv('REPORT_WORKERS', 8))
 
-def get_connection_string():
-    server = os.getenv('DB_SERVER')
-    database = os.getenv('DB_NAME')
 
-    driver = os.getenv('DB_DRIVER', 'ODBC Driver 17 for SQL Server')
-    
-    return (
-        f"DRIVER={{{driver}}};"
-        f"SERVER={server};"
-        f"DATABASE={database};"
-    )
+# name: (title, module), each module has QUERIES and generate_<name>_report
+REPORTS = {
+    'customer_demographics': ('Customer Demographics Report', 'report_customer_demographics'),
+    'risk_analysis': ('Risk Analysis Report', 'report_risk_analysis'),
+    'geographic_distribution': ('Geographic Distribution Report', 'report_geographic_distribution'),
+    'data_quality': ('Data Quality Summary Report', 'report_data_quality'),
+    'enrichment_status': ('Enrichment Status Report', 'report_enrichment_status')
+}
+
+
+def load_reports(names):
+    reports = {}
+    for name in names:
+        title, module_name = REPORTS[name]
+        module = importlib.import_module(module_name)
+        reports[name] = (title, getattr(module, f"generate_{name}_report"), module.QUERIES)
+    return reports
 
 
 def list_data_files():
@@ -73,7 +80,8 @@ def show_menu():
     print("1. Setup database")
     print("2. Select data file")
     print("3. Generate reports")
-    print("4. Exit")
+    print("4. Ingest all data files")
+    print("5. Exit")
     print()
 
 
@@ -86,6 +94,14 @@ def show_file_options(file_path):
 
 
 def run_validation(file_path):
+    from validate_recordCount import validate_recordCount
+    from validate_completness import validate_completeness
+    from validate_riskDistribution import validate_riskDistribution
+    from validate_geoDistribution import validate_geoDistribution
+    from validate_auditTrailVerification import validate_auditTrailVerification
+    from validate_file import validate_file
+    from validate_all import validate_all
+
     print(f"\n~ Running Database Validation ~")
     
     validations = {
@@ -100,6 +116,7 @@ def run_validation(file_path):
     for idx, (name, _) in validations.items():
         print(f"{idx}. {name}")
     print(f"{len(validations) + 1}. Run all validations")
+    print(f"{len(validations) + 2}. Validate {file_path.name} in memory (before loading)")
     print("0. Back to menu")
     
     try:
@@ -108,12 +125,12 @@ def run_validation(file_path):
             return
         elif choice == len(validations) + 1:
             print("\nRunning all validations...")
-            for name, func in validations.values():
-                print(f"\n{'='*50}")
-                print(f"{name}:")
-                func()
+            validate_all()
             print(f"\n{'='*50}")
             print("All validations completed")
+        elif choice == len(validations) + 2:
+            print()
+            validate_file(file_path)
         elif choice in validations:
             name, func = validations[choice]
             print(f"\n{name}:")
@@ -125,6 +142,8 @@ def run_validation(file_path):
 
 
 def load_to_database(file_path):
+    from etl_pipe import upsert_data
+
     print(f"\n~ Loading {file_path.name} to Database ~")
     try:
         connection_string = get_connection_string()
@@ -132,37 +151,60 @@ def load_to_database(file_path):
         print("Analyzing data and determining operations...")
         
         results = upsert_data(connection_string, str(file_path))
-
-        print("\n~ Results ~")
-        print(f"Total records: {results.get('total_records', 0)}")
-        print(f"New records inserted: {results.get('successful_inserts', 0)}")
-        print(f"Existing records updated: {results.get('successful_updates', 0)}")
-        print(f"Failed records: {results.get('failed_records', 0)}")
-        print(f"Processing time: {results.get('processing_time', 0):.2f}s")
-        print(f"Batch ID: {results.get('batch_id', 'N/A')}")
-        
-        if results.get('errors'):
-            print("\nErrors:")
-            for error in results['errors'][:5]:
-                print(f"  - {error}")
-        
-        if results.get('success'):
-            print("\nLoad completed successfully")
-            print("All operations logged to enrichment_audit table")
-        else:
-            print("\nLoad completed with errors")
+        print_load_results(results)
             
     except Exception as e:
         print(f"Error: {e}")
 
 
+def print_load_results(results):
+    print("\n~ Results ~")
+    print(f"Total records: {results.get('total_records', 0)}")
+    print(f"New records inserted: {results.get('successful_inserts', 0)}")
+    print(f"Existing records updated: {results.get('successful_updates', 0)}")
+    print(f"Unchanged records skipped: {results.get('unchanged_records', 0)}")
+    print(f"Duplicate rows collapsed: {results.get('collapsed_records', 0)}")
+    print(f"Failed records: {results.get('failed_records', 0)}")
+    print(f"Processing time: {results.get('processing_time', 0):.2f}s")
+    print(f"Batch ID: {results.get('batch_id', 'N/A')}")
+    stages = sorted((results.get('stage_metrics') or {}).items(), key=lambda item: -item[1]['seconds'])
+    if stages:
+        print("Slowest stages: " + ', '.join(f"{stage} {metric['seconds']:.2f}s" for stage, metric in stages[:3]))
+    
+    if results.get('error'):
+        print(f"\nError: {results['error']}")
+    if results.get('errors'):
+        print("\nErrors:")
+        for error in results['errors'][:5]:
+            print(f"  - {error}")
+    
+    if results.get('success'):
+        print("\nLoad completed successfully")
+        print("All operations logged to enrichment_audit table")
+    else:
+        print("\nLoad completed with errors")
+
+
+def ingest_data_directory(pattern='data/*.csv', **options):
+    from etl_pipe import ingest_directory
+
+    print(f"\n~ Ingesting {pattern} ~")
+    summary = ingest_directory(get_connection_string(), pattern, **options)
+    for results in summary['files']:
+        print(f"\n{Path(results['file']).name}:")
+        print_load_results(results)
+    print(f"\nIngested {len(summary['files'])} files, "
+          f"{'all succeeded' if summary['success'] else 'some with errors'}")
+    return summary
+
+
 def setup_database():
     print("\n~ Running Database Setup ~")
     orchestration_script = Path(__file__).parent / 'database-setup' / 'orchestration.py'
     
     if not orchestration_script.exists():
         print(f"Error: orchestration.py not found at {orchestration_script}")
-        return
+        return False
     
     try:
         result = subprocess.run(
@@ -182,48 +224,67 @@ def setup_database():
             print("\n~ Database setup completed successfully ~")
         else:
             print(f"\n~ Database setup failed with exit code {result.returncode} ~")
+        return result.returncode == 0
             
     except Exception as e:
         print(f"Error running orchestration script: {e}")
+        return False
+
+
+def generate_all_reports(reports, export_format=None, output_dir=None):
+    # Every query of every report goes onto one bounded pool, then the
+    # reports print in menu order as their results come in
+    with ThreadPoolExecutor(max_workers=REPORT_WORKERS) as executor:
+        pending = [
+            (func, submit_queries(queries, executor))
+            for _, func, queries in reports.values()
+        ]
+        results = []
+        for func, futures in pending:
+            print(f"\n{'='*60}")
+            results.append(func(export_format=export_format, output_dir=output_dir, pending=futures))
+    return results
+
+
+def select_export_format():
+    choice = input(f"Export format ({'/'.join(EXPORT_FORMATS)}, blank for none): ").strip().lower()
+    if choice and choice not in EXPORT_FORMATS:
+        print("Unknown format, reports will not be exported")
+        return None
+    return choice or None
 
 
 def generate_reports():
     print("\n~ Generate Business Intelligence Reports ~")
     
-    reports = {
-        1: ('Customer Demographics Report', generate_customer_demographics_report),
-        2: ('Risk Analysis Report', generate_risk_analysis_report),
-        3: ('Geographic Distribution Report', generate_geographic_distribution_report),
-        4: ('Data Quality Summary Report', generate_data_quality_report),
-        5: ('Enrichment Status Report', generate_enrichment_status_report)
-    }
+    names = dict(enumerate(REPORTS, 1))
     
     print("\nAvailable reports:")
-    for idx, (name, _) in reports.items():
-        print(f"{idx}. {name}")
-    print(f"{len(reports) + 1}. Generate all reports")
+    for idx, name in names.items():
+        print(f"{idx}. {REPORTS[name][0]}")
+    print(f"{len(names) + 1}. Generate all reports")
     print("0. Back to menu")
     
     try:
         choice = int(input("\nSelect report: "))
         if choice == 0:
             return
-        elif choice == len(reports) + 1:
+        elif choice == len(names) + 1:
+            export_format = select_export_format()
             print("\nGenerating all reports...")
-            for name, func in reports.values():
-                print(f"\n{'='*60}")
-                func()
+            generate_all_reports(load_reports(REPORTS), export_format)
             print(f"\n{'='*60}")
             print("All reports generated successfully")
-        elif choice in reports:
-            name, func = reports[choice]
-            func()
+        elif choice in names:
+            _, func, _ = load_reports([names[choice]])[names[choice]]
+            export_format = select_export_format()
+            with ThreadPoolExecutor(max_workers=REPORT_WORKERS) as executor:
+                func(executor, export_format)
         else:
             print("Invalid selection")
     except ValueError:
         print("Invalid input")
 
-
 def main():
     print("="*50)
     print("DATA ENRICHMENT LOAD - ETL PIPELINE")
@@ -258,6 +319,8 @@ def main():
             elif choice == '3':
                 generate_reports()
             elif choice == '4':
+                ingest_data_directory()
+            elif choice == '5':
                 print("\nExiting...")
                 break
             else:
@@ -269,5 +332,197 @@ def main():
             print(f"Error: {e}")
 
 
+def _resolve_data_file(name):
+    path = Path(name)
+    if not path.exists() and (Path('data') / name).exists():
+        path = Path('data') / name
+    return path
+
+
+def cli_setup(args):
+    ok = setup_database()
+    return ok, {}
+
+
+def _commit_options(args):
+    # Without --commit-every the loader's default (COMMIT_EVERY rows) applies,
+    # --commit-every 0 loads each file in one transaction with no checkpoint
+    return {} if args.commit_every is None else {'commit_every': args.commit_every}
+
+
+def _load_summary(results, file_path=None):
+    # Row-level errors can run into the thousands, keep the summary small
+    summary = dict(results)
+    if file_path is not None:
+        summary['file'] = str(file_path)
+    summary['error_count'] = len(results.get('errors', []))
+    summary['errors'] = results.get('errors', [])[:20]
+    return summary
+
+
+def cli_load(args):
+    # All files load in this process, so the pooled connection and the
+    # imported modules are reused from one file to the next
+    from etl_pipe import insert_data, upsert_data
+
+    connection_string = get_connection_string()
+    loader = insert_data if args.insert else upsert_data
+    files = []
+    for name in args.files:
+        file_path = _resolve_data_file(name)
+        print(f"\n~ Loading {file_path.name} to Database ~")
+        results = loader(connection_string, str(file_path), mode=args.mode, chunksize=args.chunksize,
+                         workers=args.workers, dedup=args.dedup, **_commit_options(args))
+        print_load_results(results)
+        files.append(_load_summary(results, file_path))
+    return all(item.get('success') for item in files), {'files': files}
+
+
+def cli_ingest(args):
+    summary = ingest_data_directory(args.pattern, mode=args.mode, workers=args.workers,
+                                    parse_workers=args.parse_workers, dedup=args.dedup, **_commit_options(args))
+    summary['files'] = [_load_summary(results) for results in summary['files']]
+    return summary.pop('success'), summary
+
+
+def cli_resume(args):
+    from etl_pipe import resume_batch
+
+    results = resume_batch(get_connection_string(), args.batch_id, chunksize=args.chunksize,
+                           workers=args.workers, dedup=args.dedup, **_commit_options(args))
+    print_load_results(results)
+    return bool(results.get('success')), _load_summary(results)
+
+
+def cli_validate(args):
+    from validate_file import validate_file
+    from validate_all import validate_all
+
+    if args.files:
+        files = []
+        for name in args.files:
+            print()
+            files.append(validate_file(_resolve_data_file(name)))
+        return all(item['passed'] for item in files), {'files': files}
+    return True, {'metrics': validate_all()}
+
+
+def cli_report(args):
+    reports = load_reports(args.reports or REPORTS)
+    results = generate_all_reports(reports, args.export, args.output_dir)
+    ok = all(result is not None for result in results)
+    return ok, {'reports': [
+        result if result is not None else {'report': name, 'error': 'report failed'}
+        for name, result in zip(reports, results)
+    ]}
+
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--json', action='store_true', help='print a JSON summary when done')
+    common.add_argument('--profile', type=int, nargs='?', const=10, metavar='N',
+                        help='time every validation and report query, print the N slowest (default: 10)')
+    common.add_argument('--profile-json', metavar='PATH', help='also write the query profile to PATH')
+
+    load_options = argparse.ArgumentParser(add_help=False)
+    load_options.add_argument('--chunksize', type=int, help='read the CSV in chunks of this many rows')
+    load_options.add_argument('--workers', type=int, default=1, help='parallel load connections')
+    load_options.add_argument('--dedup', default='last', choices=DEDUP_POLICIES,
+                              help='repeated customer_id in a batch: last, processed_date or reject (default: last)')
+
+    parser = argparse.ArgumentParser(description='Data enrichment load - ETL pipeline. Run without arguments for the menu.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    setup = commands.add_parser('setup', parents=[common], help='create the database and tables')
+    setup.set_defaults(handler=cli_setup)
+
+    load = commands.add_parser('load', parents=[common, load_options], help='load one or more CSV files')
+    load.add_argument('files', nargs='+', help='CSV paths, or file names in data/')
+    load.add_argument('--mode', default='row', choices=LOAD_MODES, help='row, bulk, merge or bcp (default: row)')
+    load.add_argument('--commit-every', type=int,
+                         help=f'commit and checkpoint every N rows (default: {COMMIT_EVERY}, 0: one commit)')
+    load.add_argument('--insert', action='store_true', help='use insert_data instead of upsert_data')
+    load.set_defaults(handler=cli_load)
+
+    ingest = commands.add_parser('ingest', parents=[common],
+                                 help='load every CSV matching a glob, oldest first')
+    ingest.add_argument('pattern', nargs='?', default='data/*.csv', help='default: data/*.csv')
+    ingest.add_argument('--mode', default='row', choices=LOAD_MODES, help='row, bulk, merge or bcp (default: row)')
+    ingest.add_argument('--workers', type=int, default=1, help='parallel load connections')
+    ingest.add_argument('--dedup', default='last', choices=DEDUP_POLICIES,
+                        help='repeated customer_id in a file: last, processed_date or reject (default: last)')
+    ingest.add_argument('--parse-workers', type=int, help='processes parsing files (default: CPU count)')
+    ingest.add_argument('--commit-every', type=int,
+                           help=f'commit and checkpoint every N rows (default: {COMMIT_EVERY}, 0: one commit)')
+    ingest.set_defaults(handler=cli_ingest)
+
+    resume = commands.add_parser('resume', parents=[common, load_options], help='resume a checkpointed load')
+    resume.add_argument('batch_id')
+    resume.add_argument('--commit-every', type=int,
+                           help=f'commit and checkpoint every N rows (default: {COMMIT_EVERY}, 0: one commit)')
+    resume.set_defaults(handler=cli_resume)
+
+    validate = commands.add_parser('validate', parents=[common],
+                                   help='validate the database, or CSV files before loading')
+    validate.add_argument('--file', dest='files', action='append', help='CSV to validate in memory, repeatable')
+    validate.set_defaults(handler=cli_validate)
+
+    report = commands.add_parser('report', parents=[common], help='generate reports')
+    report.add_argument('reports', nargs='*', metavar='report',
+                        help=f"any of {', '.join(REPORTS)} (default: all)")
+    report.add_argument('--export', choices=EXPORT_FORMATS)
+    report.add_argument('--output-dir')
+    report.set_defaults(handler=cli_report)
+
+    return parser
+
+
+@contextmanager
+def _progress_to_stderr():
+    # With --json the summary is the only thing on stdout. The redirect is
+    # on file descriptor 1, so setup's subprocess and ingest's parse
+    # workers print to stderr as well.
+    sys.stdout.flush()
+    saved = os.dup(1)
+    os.dup2(2, 1)
+    try:
+        yield
+    finally:
+        sys.stdout.flush()
+        os.dup2(saved, 1)
+        os.close(saved)
+
+
+def run_cli(argv):
+    # Exit codes: 0 success, 1 failed, 2 bad arguments (from argparse)
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    unknown = [name for name in getattr(args, 'reports', []) if name not in REPORTS]
+    if unknown:
+        parser.error(f"unknown report {', '.join(unknown)}, expected any of {', '.join(REPORTS)}")
+    if getattr(args, 'commit_every', None) is not None and args.commit_every < 0:
+        parser.error("--commit-every must be 0 or more")
+    capacity = pool_capacity()
+    if capacity is not None and getattr(args, 'workers', 1) > capacity:
+        parser.error(f"--workers {args.workers} is more than the {capacity} connections the pool allows, "
+                     f"raise DB_POOL_SIZE or DB_POOL_MAX_OVERFLOW")
+    profiling = args.profile is not None or args.profile_json
+    if profiling:
+        enable_profiling()
+    with _progress_to_stderr() if args.json else nullcontext():
+        try:
+            ok, summary = args.handler(args)
+        except Exception as e:
+            print(f"Error: {e}")
+            ok, summary = False, {'error': str(e)}
+        if profiling:
+            summary['query_profile'] = report_profile(args.profile or 10, args.profile_json)
+    if args.json:
+        print(json.dumps(dict(summary, command=args.command, success=ok), indent=2, default=json_default))
+    return 0 if ok else 1
+
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
     main()
\ No newline at end of file
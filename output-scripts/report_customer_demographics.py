@@ -1,95 +1,77 @@
-import pyodbc
-import pandas as pd
-from datetime import datetime
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-
-def get_connection_string():
-    server = os.getenv('DB_SERVER')
-    database = os.getenv('DB_NAME')
-    driver = os.getenv('DB_DRIVER', 'ODBC Driver 17 for SQL Server')
-    
-    return (
-        f"DRIVER={{{driver}}};"
-        f"SERVER={server};"
-        f"DATABASE={database};"
-    )
-
-
-def generate_customer_demographics_report():
-    try:
-        conn = pyodbc.connect(get_connection_string())
-        cursor = conn.cursor()
-        
-        print(f"\n{'='*60}")
-        print("CUSTOMER DEMOGRAPHICS REPORT")
-        print(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"{'='*60}\n")
-        
-
-        cursor.execute("SELECT COUNT(*) FROM customer_enriched")
-        total_customers = cursor.fetchone()[0]
-        print(f"Total Customers: {total_customers}\n")
-        
-
-        cursor.execute("""
-            SELECT 
-                CASE WHEN is_business = 1 THEN 'Business' ELSE 'Personal' END as customer_type,
-                COUNT(*) as count,
-                CAST(COUNT(*) * 100.0 / SUM(COUNT(*)) OVER() AS DECIMAL(5,1)) as percentage
-            FROM customer_enriched
-            GROUP BY is_business
-        """)
-        
-        print("Customer Type Distribution:")
-        for row in cursor.fetchall():
-            print(f"  {row.customer_type}: {row.count} ({row.percentage}%)")
-        
-
-        cursor.execute("""
-            SELECT 
-                company_size,
-                COUNT(*) as count
-            FROM customer_enriched
-            WHERE is_business = 1
-            GROUP BY company_size
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from report_export import generate_report
+
+
+QUERIES = {
+    'total_customers': "SELECT COALESCE(SUM(customer_count), 0) FROM customer_summary WHERE dimension = 'is_business'",
+
+    'customer_types': """
+            SELECT
+                CASE WHEN key1 = '1' THEN 'Business' ELSE 'Personal' END as customer_type,
+                customer_count as count,
+                CAST(customer_count * 100.0 / SUM(customer_count) OVER() AS DECIMAL(5,1)) as percentage
+            FROM customer_summary
+            WHERE dimension = 'is_business'
+        """,
+
+    'business_sizes': """
+            SELECT
+                key2 as company_size,
+                customer_count as count
+            FROM customer_summary
+            WHERE dimension = 'company_size' AND key1 = '1'
             ORDER BY count DESC
-        """)
-        
-        print("\nBusiness Size Distribution:")
-        for row in cursor.fetchall():
-            print(f"  {row.company_size}: {row.count}")
-        
-
-        cursor.execute("""
+        """,
+
+    'top_industries': """
             SELECT TOP 10
-                industry,
-                COUNT(*) as count,
-                CAST(COUNT(*) * 100.0 / SUM(COUNT(*)) OVER() AS DECIMAL(5,1)) as percentage
-            FROM customer_enriched
-            WHERE industry IS NOT NULL AND industry != 'Personal'
-            GROUP BY industry
+                key1 as industry,
+                customer_count as count,
+                CAST(customer_count * 100.0 / SUM(customer_count) OVER() AS DECIMAL(5,1)) as percentage
+            FROM customer_summary
+            WHERE dimension = 'industry' AND key1 IS NOT NULL AND key1 != 'Personal'
             ORDER BY count DESC
-        """)
-        
-        print("\nTop Industries:")
-        for row in cursor.fetchall():
-            print(f"  {row.industry}: {row.count} ({row.percentage}%)")
-        
-        print(f"\n{'='*60}")
-        print("Report generation completed successfully")
-        print(f"{'='*60}\n")
-        
-        conn.close()
-        return True
-        
-    except Exception as e:
-        print(f"Error generating demographics report: {e}")
-        return False
+        """,
+}
+
+
+def print_customer_demographics_report(data):
+    print(f"\n{'='*60}")
+    print("CUSTOMER DEMOGRAPHICS REPORT")
+    print(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"{'='*60}\n")
+
+
+    total_customers = data['total_customers'][0][0]
+    print(f"Total Customers: {total_customers}\n")
+
+
+    print("Customer Type Distribution:")
+    for row in data['customer_types']:
+        print(f"  {row.customer_type}: {row.count} ({row.percentage}%)")
+
+
+    print("\nBusiness Size Distribution:")
+    for row in data['business_sizes']:
+        print(f"  {row.company_size}: {row.count}")
+
+
+    print("\nTop Industries:")
+    for row in data['top_industries']:
+        print(f"  {row.industry}: {row.count} ({row.percentage}%)")
+
+    print(f"\n{'='*60}")
+    print("Report generation completed successfully")
+    print(f"{'='*60}\n")
+
+
+def generate_customer_demographics_report(executor=None, export_format=None, output_dir=None, pending=None):
+    return generate_report('customer_demographics', QUERIES, print_customer_demographics_report, executor, export_format, output_dir, pending)
 
 
 if __name__ == "__main__":
-    generate_customer_demographics_report()
+    generate_customer_demographics_report(export_format=sys.argv[1] if len(sys.argv) > 1 else None)
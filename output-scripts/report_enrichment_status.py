@@ -1,71 +1,34 @@
-import pyodbc
-import pandas as pd
-from datetime import datetime
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-
-def get_connection_string():
-    server = os.getenv('DB_SERVER')
-    database = os.getenv('DB_NAME')
-    driver = os.getenv('DB_DRIVER', 'ODBC Driver 17 for SQL Server')
-    
-    return (
-        f"DRIVER={{{driver}}};"
-        f"SERVER={server};"
-        f"DATABASE={database};"
-    )
-
-
-def generate_enrichment_status_report():
-    try:
-        conn = pyodbc.connect(get_connection_string())
-        cursor = conn.cursor()
-        
-        print(f"\n{'='*60}")
-        print("ENRICHMENT STATUS REPORT")
-        print(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"{'='*60}\n")
-        
-
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as total_records,
-                SUM(CASE WHEN geo_enriched = 1 THEN 1 ELSE 0 END) as geo_enriched,
-                SUM(CASE WHEN is_business = 1 THEN 1 ELSE 0 END) as business_enriched,
-                SUM(CASE WHEN calculated_risk IS NOT NULL THEN 1 ELSE 0 END) as risk_calculated
-            FROM customer_enriched
-        """)
-        
-        row = cursor.fetchone()
-        total = row.total_records
-        
-        print("Enrichment Coverage:")
-        print(f"  Total Records: {total}")
-        print(f"  Geographic Enrichment: {row.geo_enriched}/{total} ({row.geo_enriched/total*100:.1f}%)")
-        print(f"  Business Classification: {row.business_enriched}/{total} ({row.business_enriched/total*100:.1f}%)")
-        print(f"  Risk Assessment: {row.risk_calculated}/{total} ({row.risk_calculated/total*100:.1f}%)")
-        
-
-        cursor.execute("""
-            SELECT 
-                enrichment_status,
-                COUNT(*) as count,
-                CAST(COUNT(*) * 100.0 / SUM(COUNT(*)) OVER() AS DECIMAL(5,1)) as percentage
-            FROM customer_enriched
-            GROUP BY enrichment_status
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from report_export import generate_report
+
+
+QUERIES = {
+    'coverage': """
+            SELECT
+                SUM(CASE WHEN dimension = 'is_business' THEN customer_count ELSE 0 END) as total_records,
+                SUM(CASE WHEN dimension = 'geo_enriched' AND key1 = '1' THEN customer_count ELSE 0 END) as geo_enriched,
+                SUM(CASE WHEN dimension = 'is_business' AND key1 = '1' THEN customer_count ELSE 0 END) as business_enriched,
+                SUM(CASE WHEN dimension = 'risk' AND key1 IS NOT NULL THEN customer_count ELSE 0 END) as risk_calculated
+            FROM customer_summary
+            WHERE dimension IN ('is_business', 'geo_enriched', 'risk')
+        """,
+
+    'enrichment_status': """
+            SELECT
+                key1 as enrichment_status,
+                customer_count as count,
+                CAST(customer_count * 100.0 / SUM(customer_count) OVER() AS DECIMAL(5,1)) as percentage
+            FROM customer_summary
+            WHERE dimension = 'enrichment_status'
             ORDER BY count DESC
-        """)
-        
-        print("\n\nEnrichment Status Breakdown:")
-        for row in cursor.fetchall():
-            print(f"  {row.enrichment_status}: {row.count} ({row.percentage}%)")
-        
-
-        cursor.execute("""
-            SELECT 
+        """,
+
+    'data_sources': """
+            SELECT
                 data_source,
                 COUNT(*) as count,
                 MIN(processed_date) as first_processed,
@@ -73,17 +36,9 @@ def generate_enrichment_status_report():
             FROM customer_enriched
             GROUP BY data_source
             ORDER BY count DESC
-        """)
-        
-        print("\n\nData Source Tracking:")
-        for row in cursor.fetchall():
-            print(f"\n  Source: {row.data_source}")
-            print(f"    Records: {row.count}")
-            print(f"    First Processed: {row.first_processed}")
-            print(f"    Last Processed: {row.last_processed}")
-        
-
-        cursor.execute("""
+        """,
+
+    'recent_batches': """
             SELECT TOP 5
                 batch_id,
                 records_processed,
@@ -93,28 +48,75 @@ def generate_enrichment_status_report():
                 DATEDIFF(SECOND, processing_start, processing_end) as duration_seconds
             FROM enrichment_audit
             ORDER BY processing_start DESC
-        """)
-        
-        print("\n\nRecent Processing Batches:")
-        for idx, row in enumerate(cursor.fetchall(), 1):
-            success_rate = (row.records_successful / row.records_processed * 100) if row.records_processed > 0 else 0
-            print(f"\n  Batch {idx}: {str(row.batch_id)[:8]}...")
-            print(f"    Processed: {row.records_processed} records")
-            print(f"    Success Rate: {success_rate:.1f}%")
-            print(f"    Duration: {row.duration_seconds}s")
-            print(f"    Timestamp: {row.processing_start}")
-        
-        print(f"\n{'='*60}")
-        print("Report generation completed successfully")
-        print(f"{'='*60}\n")
-        
-        conn.close()
-        return True
-        
-    except Exception as e:
-        print(f"Error generating enrichment status report: {e}")
-        return False
+        """,
+
+    'stage_timings': """
+            SELECT
+                m.batch_id,
+                m.stage,
+                SUM(m.seconds) as seconds,
+                SUM(m.rows_processed) as rows_processed,
+                MAX(m.peak_memory_mb) as peak_memory_mb
+            FROM load_stage_metrics m
+            WHERE m.batch_id IN (SELECT TOP 5 batch_id FROM enrichment_audit ORDER BY processing_start DESC)
+            GROUP BY m.batch_id, m.stage
+            ORDER BY m.batch_id, seconds DESC
+        """,
+}
+
+
+def print_enrichment_status_report(data):
+    print(f"\n{'='*60}")
+    print("ENRICHMENT STATUS REPORT")
+    print(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"{'='*60}\n")
+
+
+    row = data['coverage'][0]
+    total = row.total_records
+
+    print("Enrichment Coverage:")
+    print(f"  Total Records: {total}")
+    print(f"  Geographic Enrichment: {row.geo_enriched}/{total} ({row.geo_enriched/total*100:.1f}%)")
+    print(f"  Business Classification: {row.business_enriched}/{total} ({row.business_enriched/total*100:.1f}%)")
+    print(f"  Risk Assessment: {row.risk_calculated}/{total} ({row.risk_calculated/total*100:.1f}%)")
+
+
+    print("\n\nEnrichment Status Breakdown:")
+    for row in data['enrichment_status']:
+        print(f"  {row.enrichment_status}: {row.count} ({row.percentage}%)")
+
+
+    print("\n\nData Source Tracking:")
+    for row in data['data_sources']:
+        print(f"\n  Source: {row.data_source}")
+        print(f"    Records: {row.count}")
+        print(f"    First Processed: {row.first_processed}")
+        print(f"    Last Processed: {row.last_processed}")
+
+
+    print("\n\nRecent Processing Batches:")
+    for idx, row in enumerate(data['recent_batches'], 1):
+        success_rate = (row.records_successful / row.records_processed * 100) if row.records_processed > 0 else 0
+        print(f"\n  Batch {idx}: {str(row.batch_id)[:8]}...")
+        print(f"    Processed: {row.records_processed} records")
+        print(f"    Success Rate: {success_rate:.1f}%")
+        print(f"    Duration: {row.duration_seconds}s")
+        print(f"    Timestamp: {row.processing_start}")
+        stages = [stage for stage in data['stage_timings'] if stage.batch_id == row.batch_id]
+        if stages:
+            slowest = ', '.join(f"{stage.stage} {stage.seconds:.2f}s" for stage in stages[:3])
+            print(f"    Slowest Stages: {slowest}")
+            print(f"    Peak Memory: {max(stage.peak_memory_mb or 0 for stage in stages):.0f} MB")
+
+    print(f"\n{'='*60}")
+    print("Report generation completed successfully")
+    print(f"{'='*60}\n")
+
+
+def generate_enrichment_status_report(executor=None, export_format=None, output_dir=None, pending=None):
+    return generate_report('enrichment_status', QUERIES, print_enrichment_status_report, executor, export_format, output_dir, pending)
 
 
 if __name__ == "__main__":
-    generate_enrichment_status_report()
+    generate_enrichment_status_report(export_format=sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,93 @@
+import os
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+
+from connection_manager import collect_queries, run_queries
+
+EXPORT_FORMATS = ('json', 'csv', 'parquet')
+REPORT_DIR = os.getenv('REPORT_OUTPUT_DIR', 'reports')
+
+
+def rows_to_records(name, rows):
+    # Unnamed columns such as a bare COUNT(*) take the section name
+    if not rows:
+        return []
+    columns = [column[0] or name for column in rows[0].cursor_description]
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def build_report(name, data):
+    return {
+        'report': name,
+        'generated_at': datetime.now(),
+        'sections': {key: rows_to_records(key, rows) for key, rows in data.items()}
+    }
+
+
+def json_default(value):
+    # DataFrames, Series, dates, Decimals and numpy scalars in reports and
+    # CLI summaries
+    if hasattr(value, 'columns'):
+        return value.to_dict('records')
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def export_report(report, export_format, output_dir=None):
+    # json writes one file per report, csv and parquet one file per section
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{export_format}', expected one of {EXPORT_FORMATS}")
+    output_dir = Path(output_dir or REPORT_DIR)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    prefix = f"{report['report']}_{report['generated_at'].strftime('%Y%m%d_%H%M%S')}"
+
+    if export_format == 'json':
+        path = output_dir / f"{prefix}.json"
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2, default=json_default)
+        paths = [path]
+    else:
+        import pandas as pd
+
+        paths = []
+        for section, records in report['sections'].items():
+            if not records:
+                continue
+            df = pd.DataFrame(records)
+            path = output_dir / f"{prefix}_{section}.{export_format}"
+            if export_format == 'csv':
+                df.to_csv(path, index=False)
+            else:
+                try:
+                    df.to_parquet(path, index=False)
+                except ImportError as e:
+                    raise ImportError("Parquet export needs pyarrow, install it with: pip install pyarrow") from e
+            paths.append(path)
+
+    print(f"Exported {report['report']} to {', '.join(str(path) for path in paths)}")
+    return paths
+
+
+def generate_report(name, queries, print_report, executor=None, export_format=None, output_dir=None,
+                    pending=None):
+    # pending: futures from submit_queries when the queries are already running
+    try:
+        data = collect_queries(pending) if pending else run_queries(queries, executor)
+        print_report(data)
+        report = build_report(name, data)
+        if export_format:
+            export_report(report, export_format, output_dir)
+        return report
+
+    except Exception as e:
+        print(f"Error generating {name.replace('_', ' ')} report: {e}")
+        return None
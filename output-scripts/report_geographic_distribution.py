@@ -1,108 +1,86 @@
-import pyodbc
-import pandas as pd
-from datetime import datetime
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-
-def get_connection_string():
-    server = os.getenv('DB_SERVER')
-    database = os.getenv('DB_NAME')
-    username = os.getenv('DB_USER')
-    password = os.getenv('DB_PASSWORD')
-    driver = os.getenv('DB_DRIVER', 'ODBC Driver 17 for SQL Server')
-    
-    return (
-        f"DRIVER={{{driver}}};"
-        f"SERVER={server};"
-        f"DATABASE={database};"
-    )
-
-
-def generate_geographic_distribution_report():
-    try:
-        conn = pyodbc.connect(get_connection_string())
-        cursor = conn.cursor()
-        
-        print(f"\n{'='*60}")
-        print("GEOGRAPHIC DISTRIBUTION REPORT")
-        print(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"{'='*60}\n")
-        
-
-        cursor.execute("""
-            SELECT 
-                country,
-                COUNT(*) as customer_count,
-                CAST(COUNT(*) * 100.0 / SUM(COUNT(*)) OVER() AS DECIMAL(5,1)) as percentage
-            FROM customer_enriched
-            WHERE country IS NOT NULL AND country != ''
-            GROUP BY country
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from report_export import generate_report
+
+
+QUERIES = {
+    'countries': """
+            SELECT
+                key1 as country,
+                customer_count,
+                CAST(customer_count * 100.0 / SUM(customer_count) OVER() AS DECIMAL(5,1)) as percentage
+            FROM customer_summary
+            WHERE dimension = 'country' AND key1 IS NOT NULL AND key1 != ''
             ORDER BY customer_count DESC
-        """)
-        
-        print("Distribution by Country:")
-        for row in cursor.fetchall():
-            print(f"  {row.country}: {row.customer_count} ({row.percentage}%)")
-        
-
-        cursor.execute("""
-            SELECT 
-                region,
-                COUNT(*) as customer_count,
-                CAST(COUNT(*) * 100.0 / SUM(COUNT(*)) OVER() AS DECIMAL(5,1)) as percentage
-            FROM customer_enriched
-            WHERE region IS NOT NULL AND region != 'Unknown' AND region != ''
-            GROUP BY region
+        """,
+
+    'regions': """
+            SELECT
+                key1 as region,
+                customer_count,
+                CAST(customer_count * 100.0 / SUM(customer_count) OVER() AS DECIMAL(5,1)) as percentage
+            FROM customer_summary
+            WHERE dimension = 'region' AND key1 IS NOT NULL AND key1 != 'Unknown' AND key1 != ''
             ORDER BY customer_count DESC
-        """)
-        
-        print("\n\nDistribution by Region:")
-        for row in cursor.fetchall():
-            print(f"  {row.region}: {row.customer_count} ({row.percentage}%)")
-        
-
-        cursor.execute("""
+        """,
+
+    'top_districts': """
             SELECT TOP 15
-                district,
-                COUNT(*) as customer_count
-            FROM customer_enriched
-            WHERE district IS NOT NULL AND district != ''
-            GROUP BY district
+                key1 as district,
+                customer_count
+            FROM customer_summary
+            WHERE dimension = 'district' AND key1 IS NOT NULL AND key1 != ''
             ORDER BY customer_count DESC
-        """)
-        
-        print("\n\nTop Districts/Cities:")
-        for idx, row in enumerate(cursor.fetchall(), 1):
-            print(f"  {idx}. {row.district}: {row.customer_count}")
-        
-
-        cursor.execute("""
-            SELECT 
-                CASE WHEN geo_enriched = 1 THEN 'Enriched' ELSE 'Not Enriched' END as status,
-                COUNT(*) as count,
-                CAST(COUNT(*) * 100.0 / SUM(COUNT(*)) OVER() AS DECIMAL(5,1)) as percentage
-            FROM customer_enriched
-            GROUP BY geo_enriched
-        """)
-        
-        print("\n\nGeographic Enrichment Status:")
-        for row in cursor.fetchall():
-            print(f"  {row.status}: {row.count} ({row.percentage}%)")
-        
-        print(f"\n{'='*60}")
-        print("Report generation completed successfully")
-        print(f"{'='*60}\n")
-        
-        conn.close()
-        return True
-        
-    except Exception as e:
-        print(f"Error generating geographic distribution report: {e}")
-        return False
+        """,
+
+    'geo_enrichment': """
+            SELECT
+                CASE WHEN key1 = '1' THEN 'Enriched' ELSE 'Not Enriched' END as status,
+                customer_count as count,
+                CAST(customer_count * 100.0 / SUM(customer_count) OVER() AS DECIMAL(5,1)) as percentage
+            FROM customer_summary
+            WHERE dimension = 'geo_enriched'
+        """,
+}
+
+
+def print_geographic_distribution_report(data):
+    print(f"\n{'='*60}")
+    print("GEOGRAPHIC DISTRIBUTION REPORT")
+    print(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"{'='*60}\n")
+
+
+    print("Distribution by Country:")
+    for row in data['countries']:
+        print(f"  {row.country}: {row.customer_count} ({row.percentage}%)")
+
+
+    print("\n\nDistribution by Region:")
+    for row in data['regions']:
+        print(f"  {row.region}: {row.customer_count} ({row.percentage}%)")
+
+
+    print("\n\nTop Districts/Cities:")
+    for idx, row in enumerate(data['top_districts'], 1):
+        print(f"  {idx}. {row.district}: {row.customer_count}")
+
+
+    print("\n\nGeographic Enrichment Status:")
+    for row in data['geo_enrichment']:
+        print(f"  {row.status}: {row.count} ({row.percentage}%)")
+
+    print(f"\n{'='*60}")
+    print("Report generation completed successfully")
+    print(f"{'='*60}\n")
+
+
+def generate_geographic_distribution_report(executor=None, export_format=None, output_dir=None, pending=None):
+    return generate_report('geographic_distribution', QUERIES, print_geographic_distribution_report, executor, export_format, output_dir, pending)
 
 
 if __name__ == "__main__":
-    generate_geographic_distribution_report()
+    generate_geographic_distribution_report(export_format=sys.argv[1] if len(sys.argv) > 1 else None)
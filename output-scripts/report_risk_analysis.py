@@ -1,80 +1,38 @@
-import pyodbc
-import pandas as pd
-from datetime import datetime
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-
-def get_connection_string():
-    server = os.getenv('DB_SERVER')
-    database = os.getenv('DB_NAME')
-    driver = os.getenv('DB_DRIVER', 'ODBC Driver 17 for SQL Server')
-    
-    return (
-        f"DRIVER={{{driver}}};"
-        f"SERVER={server};"
-        f"DATABASE={database};"
-    )
-
-
-def generate_risk_analysis_report():
-    try:
-        conn = pyodbc.connect(get_connection_string())
-        cursor = conn.cursor()
-        
-        print(f"\n{'='*60}")
-        print("RISK ANALYSIS REPORT")
-        print(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"{'='*60}\n")
-        
-
-        cursor.execute("""
-            SELECT 
-                calculated_risk,
-                COUNT(*) as customer_count,
-                CAST(COUNT(*) * 100.0 / SUM(COUNT(*)) OVER() AS DECIMAL(5,1)) as percentage,
-                AVG(CAST(risk_score_numeric AS FLOAT)) as avg_risk_score,
-                MIN(risk_score_numeric) as min_score,
-                MAX(risk_score_numeric) as max_score
-            FROM customer_enriched
-            GROUP BY calculated_risk
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from report_export import generate_report
+
+
+QUERIES = {
+    'risk_levels': """
+            SELECT
+                key1 as calculated_risk,
+                SUM(customer_count) as customer_count,
+                CAST(SUM(customer_count) * 100.0 / SUM(SUM(customer_count)) OVER() AS DECIMAL(5,1)) as percentage,
+                SUM(CAST(key2 AS FLOAT) * customer_count)
+                    / NULLIF(SUM(CASE WHEN key2 IS NOT NULL THEN customer_count END), 0) as avg_risk_score,
+                MIN(CAST(key2 AS INT)) as min_score,
+                MAX(CAST(key2 AS INT)) as max_score
+            FROM customer_summary
+            WHERE dimension = 'risk'
+            GROUP BY key1
             ORDER BY avg_risk_score DESC
-        """)
-        
-        print("Risk Level Distribution:")
-        total = 0
-        for row in cursor.fetchall():
-            total += row.customer_count
-            print(f"\n  {row.calculated_risk} Risk:")
-            print(f"    Customers: {row.customer_count} ({row.percentage}%)")
-            print(f"    Avg Score: {row.avg_risk_score:.2f}")
-            print(f"    Score Range: {row.min_score} - {row.max_score}")
-        
-        print(f"\nTotal Customers Analyzed: {total}")
-        
-
-        cursor.execute("""
-            SELECT 
-                CASE WHEN is_business = 1 THEN 'Business' ELSE 'Personal' END as customer_type,
-                calculated_risk,
-                COUNT(*) as count
-            FROM customer_enriched
-            GROUP BY is_business, calculated_risk
-            ORDER BY is_business, calculated_risk
-        """)
-        
-        print("\n\nRisk by Customer Type:")
-        current_type = None
-        for row in cursor.fetchall():
-            if current_type != row.customer_type:
-                current_type = row.customer_type
-                print(f"\n  {current_type}:")
-            print(f"    {row.calculated_risk} Risk: {row.count}")
-        
-
-        cursor.execute("""
+        """,
+
+    'risk_by_type': """
+            SELECT
+                CASE WHEN key1 = '1' THEN 'Business' ELSE 'Personal' END as customer_type,
+                key2 as calculated_risk,
+                customer_count as count
+            FROM customer_summary
+            WHERE dimension = 'risk_by_type'
+            ORDER BY key1, key2
+        """,
+
+    'top_risk_customers': """
             SELECT TOP 10
                 customer_id,
                 first_name,
@@ -85,25 +43,52 @@ def generate_risk_analysis_report():
             FROM customer_enriched
             WHERE calculated_risk IN ('High', 'Medium')
             ORDER BY risk_score_numeric DESC
-        """)
-        
-        print("\n\nTop Risk Customers:")
-        for idx, row in enumerate(cursor.fetchall(), 1):
-            print(f"\n  {idx}. Customer {row.customer_id} - {row.first_name} {row.last_name}")
-            print(f"     Risk: {row.calculated_risk} (Score: {row.risk_score_numeric})")
-            print(f"     Factors: {row.risk_factors}")
-        
-        print(f"\n{'='*60}")
-        print("Report generation completed successfully")
-        print(f"{'='*60}\n")
-        
-        conn.close()
-        return True
-        
-    except Exception as e:
-        print(f"Error generating risk analysis report: {e}")
-        return False
+        """,
+}
+
+
+def print_risk_analysis_report(data):
+    print(f"\n{'='*60}")
+    print("RISK ANALYSIS REPORT")
+    print(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"{'='*60}\n")
+
+
+    print("Risk Level Distribution:")
+    total = 0
+    for row in data['risk_levels']:
+        total += row.customer_count
+        print(f"\n  {row.calculated_risk} Risk:")
+        print(f"    Customers: {row.customer_count} ({row.percentage}%)")
+        print(f"    Avg Score: {row.avg_risk_score:.2f}")
+        print(f"    Score Range: {row.min_score} - {row.max_score}")
+
+    print(f"\nTotal Customers Analyzed: {total}")
+
+
+    print("\n\nRisk by Customer Type:")
+    current_type = None
+    for row in data['risk_by_type']:
+        if current_type != row.customer_type:
+            current_type = row.customer_type
+            print(f"\n  {current_type}:")
+        print(f"    {row.calculated_risk} Risk: {row.count}")
+
+
+    print("\n\nTop Risk Customers:")
+    for idx, row in enumerate(data['top_risk_customers'], 1):
+        print(f"\n  {idx}. Customer {row.customer_id} - {row.first_name} {row.last_name}")
+        print(f"     Risk: {row.calculated_risk} (Score: {row.risk_score_numeric})")
+        print(f"     Factors: {row.risk_factors}")
+
+    print(f"\n{'='*60}")
+    print("Report generation completed successfully")
+    print(f"{'='*60}\n")
+
+
+def generate_risk_analysis_report(executor=None, export_format=None, output_dir=None, pending=None):
+    return generate_report('risk_analysis', QUERIES, print_risk_analysis_report, executor, export_format, output_dir, pending)
 
 
 if __name__ == "__main__":
-    generate_risk_analysis_report()
+    generate_risk_analysis_report(export_format=sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,285 @@
+import re
+import sys
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from operator import itemgetter
+
+# Embedded stand-in for SQL Server, selected with a sqlite:/// connection
+# string (DB_BACKEND=sqlite). The rest of the repo keeps writing T-SQL: the
+# cursor here translates each statement on the way in (TOP, GETDATE,
+# DATEDIFF, DECIMAL casts, GROUPING SETS, savepoints) and returns rows that
+# behave like pyodbc rows. Statements with no mechanical translation, such
+# as MERGE, register a SQLite version with register_statements.
+
+SCHEME = 'sqlite:///'
+
+_statements = {}
+
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_adapter(Decimal, float)
+
+
+def database_path(connection_string):
+    return connection_string[len(SCHEME):]
+
+
+def register_statements(tsql, *statements):
+    # Every statement runs in order with the same parameters (statements
+    # without placeholders get none); results come from the last one
+    _statements[tsql] = statements
+
+
+def translate(sql):
+    return _statements.get(sql) or (_translate(sql),)
+
+
+def _split_top_level(text, start=0):
+    # Splits on commas outside parentheses and quotes, up to the ')' that
+    # closes an already opened '('. Returns the parts and the index after it.
+    depth, parts, begin, quoted = 0, [], start, False
+    for index in range(start, len(text)):
+        char = text[index]
+        if char == "'":
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            if depth == 0:
+                parts.append(text[begin:index].strip())
+                return parts, index + 1
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(text[begin:index].strip())
+            begin = index + 1
+    parts.append(text[begin:].strip())
+    return parts, len(text)
+
+
+def _scope_end(text, start):
+    # Index of the ')' closing the parentheses that contain start, or None
+    depth, quoted = 0, False
+    for index in range(start, len(text)):
+        char = text[index]
+        if char == "'":
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            if depth == 0:
+                return index
+            depth -= 1
+    return None
+
+
+def _replace_calls(sql, name, render):
+    pattern = re.compile(rf'\b{name}\s*\(', re.IGNORECASE)
+    pieces, position = [], 0
+    while (match := pattern.search(sql, position)):
+        args, end = _split_top_level(sql, match.end())
+        args = [_replace_calls(arg, name, render) for arg in args]
+        pieces.extend([sql[position:match.start()], render(args)])
+        position = end
+    pieces.append(sql[position:])
+    return ''.join(pieces)
+
+
+DATEDIFF_UNIT_SECONDS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+def _datediff(args):
+    # Like SQL Server, counts the unit boundaries crossed; whole epoch
+    # seconds avoid the float error of julianday differences
+    unit, start, end = args
+    seconds = DATEDIFF_UNIT_SECONDS[unit.lower()]
+    return (f"(CAST(strftime('%s', {end}) AS INTEGER) / {seconds}"
+            f" - CAST(strftime('%s', {start}) AS INTEGER) / {seconds})")
+
+
+def _cast(args):
+    # DECIMAL(p,s) has NUMERIC affinity in SQLite, which does not round
+    expression, _, type_name = args[0].rpartition(' AS ')
+    decimal = re.fullmatch(r'(?:DECIMAL|NUMERIC)\s*\(\s*\d+\s*,\s*(\d+)\s*\)', type_name.strip(), re.IGNORECASE)
+    if decimal:
+        return f"ROUND({expression}, {decimal.group(1)})"
+    return f"CAST({args[0]})"
+
+
+def _grouping_sets(sql):
+    # SELECT ... GROUP BY GROUPING SETS ((a), (b), ()) becomes one SELECT
+    # per set joined with UNION ALL; GROUPING(col) turns into 0/1 and
+    # grouped columns outside the set into NULL
+    match = re.search(r'^\s*SELECT\s+(.*?)\s+FROM\s+(.*?)\s*GROUP BY\s+GROUPING SETS\s*\(',
+                      sql, re.IGNORECASE | re.DOTALL)
+    if not match:
+        return sql
+    items, _ = _split_top_level(match.group(1) + ')')
+    sets, end = _split_top_level(sql, match.end())
+    sets = [[column for column in _split_top_level(grouping_set.strip()[1:])[0] if column]
+            for grouping_set in sets]
+    grouped = {column for grouping_set in sets for column in grouping_set}
+
+    selects = []
+    for grouping_set in sets:
+        columns = []
+        for item in items:
+            parts = re.split(r'\s+AS\s+', item, maxsplit=1, flags=re.IGNORECASE)
+            expression, alias = parts[0], parts[-1]
+            rolled_up = re.fullmatch(r'GROUPING\s*\(\s*(\w+)\s*\)', expression, re.IGNORECASE)
+            if rolled_up:
+                columns.append(f"{int(rolled_up.group(1) not in grouping_set)} AS {alias}")
+            elif expression in grouped and expression not in grouping_set:
+                columns.append(f"NULL AS {alias}")
+            else:
+                columns.append(item)
+        group_by = f" GROUP BY {', '.join(grouping_set)}" if grouping_set else ''
+        selects.append(f"SELECT {', '.join(columns)} FROM {match.group(2)}{group_by}")
+    return '\nUNION ALL\n'.join(selects) + sql[end:]
+
+
+@lru_cache(maxsize=512)
+def _translate(sql):
+    sql = _grouping_sets(sql)
+    sql = re.sub(r'\bSAVE TRANSACTION\s+(\w+)', r'SAVEPOINT \1', sql, flags=re.IGNORECASE)
+    sql = re.sub(r'\bIF @@TRANCOUNT > 0 ROLLBACK TRANSACTION\s+(\w+)', r'ROLLBACK TO \1', sql,
+                 flags=re.IGNORECASE)
+    sql = re.sub(r'\bGETDATE\(\)', "datetime('now', 'localtime')", sql, flags=re.IGNORECASE)
+    sql = _replace_calls(sql, 'DATEDIFF', _datediff)
+    sql = _replace_calls(sql, 'CAST', _cast)
+    # Last match first, so a TOP in a subquery gets its LIMIT inside the parentheses
+    for top in reversed(list(re.finditer(r'\bSELECT\s+TOP\s+(\d+)', sql, re.IGNORECASE))):
+        end = _scope_end(sql, top.end())
+        if end is None:
+            sql = f"{sql[:top.start()]}SELECT{sql[top.end():].rstrip().rstrip(';')}\nLIMIT {top.group(1)}"
+        else:
+            sql = f"{sql[:top.start()]}SELECT{sql[top.end():end].rstrip()} LIMIT {top.group(1)}{sql[end:]}"
+    return sql
+
+
+class Row(tuple):
+    # pyodbc rows allow row.column and carry cursor_description; each
+    # result shape gets a subclass with one property per column, which
+    # also wins over tuple methods for columns named count or index
+    __slots__ = ()
+    cursor_description = ()
+
+
+@lru_cache(maxsize=256)
+def row_class(description):
+    attributes = {column[0]: property(itemgetter(index)) for index, column in enumerate(description)}
+    return type('Row', (Row,), {'__slots__': (), 'cursor_description': description, **attributes})
+
+
+def _params(params):
+    # pyodbc takes execute(sql, a, b), execute(sql, (a, b)) and execute(sql, a)
+    if len(params) == 1 and isinstance(params[0], (list, tuple)):
+        return params[0]
+    return params
+
+
+class Cursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        # Set by the loader for pyodbc, executemany is already array-bound here
+        self.fast_executemany = False
+
+    def execute(self, sql, *params):
+        params = _params(params)
+        for statement in translate(sql):
+            self._cursor.execute(statement, params if '?' in statement else ())
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        seq_of_params = list(seq_of_params)
+        for statement in translate(sql):
+            self._cursor.executemany(statement, seq_of_params)
+
+    def _row(self, row):
+        return row_class(self._cursor.description)(row)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        return None if row is None else self._row(row)
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def fetchmany(self, size=1):
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def close(self):
+        self._cursor.close()
+
+
+class Connection:
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, timeout=60, check_same_thread=False)
+
+    def cursor(self):
+        return Cursor(self._conn.cursor())
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+
+def _register_numpy():
+    # Prepared frames hand numpy and pandas scalars to executemany. Only
+    # once something has imported them, but through import statements: a
+    # report thread can get here while the main thread is still partway
+    # through importing pandas, and the import waits for it to finish
+    if 'numpy' in sys.modules:
+        import numpy
+
+        for numpy_type in (numpy.int64, numpy.int32, numpy.int8, numpy.bool_):
+            sqlite3.register_adapter(numpy_type, int)
+        sqlite3.register_adapter(numpy.float64, float)
+    if 'pandas' in sys.modules:
+        import pandas
+
+        sqlite3.register_adapter(pandas.Timestamp, lambda value: value.isoformat(' '))
+
+
+def connect(connection_string):
+    _register_numpy()
+    return Connection(database_path(connection_string))
+
+
+def read_frame(sql, connection_string):
+    import pandas as pd
+
+    conn = sqlite3.connect(database_path(connection_string), timeout=60)
+    try:
+        return pd.read_sql(translate(sql)[-1], conn)
+    finally:
+        conn.close()
+
+
+def run_script(connection_string, script):
+    conn = sqlite3.connect(database_path(connection_string))
+    try:
+        conn.executescript(script)
+    finally:
+        conn.close()
@@ -0,0 +1,44 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+for folder in ('', 'etl-pipeline', 'data-validation', 'output-scripts'):
+    sys.path.append(str(ROOT / folder))
+
+DATA_DIR = ROOT / 'data'
+
+
+@pytest.fixture
+def warehouse(tmp_path, monkeypatch):
+    # A fresh SQLite warehouse per test, created from database-setup/sqlite
+    monkeypatch.setenv('DB_BACKEND', 'sqlite')
+    monkeypatch.setenv('SQLITE_PATH', str(tmp_path / 'warehouse.db'))
+    monkeypatch.setenv('QUERY_CACHE_DIR', str(tmp_path / 'query_cache'))
+    from connection_manager import clear_query_cache, get_connection_string
+    from sqlite_backend import run_script
+
+    connection_string = get_connection_string()
+    for sql_path in sorted((ROOT / 'database-setup' / 'sqlite').glob('*.sql')):
+        run_script(connection_string, sql_path.read_text(encoding='utf-8'))
+    clear_query_cache()
+    yield connection_string
+    clear_query_cache()
+
+
+@pytest.fixture
+def fetch(warehouse):
+    # Uncached rows as plain tuples
+    from connection_manager import get_connection
+
+    def fetch(sql, *params):
+        conn = get_connection(warehouse)
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, *params)
+            return [tuple(row) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+    return fetch
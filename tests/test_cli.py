@@ -0,0 +1,21 @@
+import pytest
+
+import main
+from conftest import DATA_DIR
+
+
+def test_report_export_csv(warehouse, tmp_path):
+    assert main.run_cli(['load', str(DATA_DIR / 'new_users.csv'), '--mode', 'bulk']) == 0
+    output_dir = tmp_path / 'reports'
+    assert main.run_cli(['report', '--export', 'csv', '--output-dir', str(output_dir)]) == 0
+    for name in main.REPORTS:
+        assert list(output_dir.glob(f'{name}_*.csv')), name
+
+
+def test_workers_beyond_the_pool_are_rejected(monkeypatch):
+    monkeypatch.setenv('DB_BACKEND', 'mssql')
+    monkeypatch.setenv('DB_POOL_SIZE', '2')
+    monkeypatch.setenv('DB_POOL_MAX_OVERFLOW', '1')
+    with pytest.raises(SystemExit) as exit_info:
+        main.run_cli(['load', str(DATA_DIR / 'new_users.csv'), '--workers', '4'])
+    assert exit_info.value.code == 2
@@ -0,0 +1,30 @@
+import connection_manager
+from conftest import DATA_DIR
+from connection_manager import clear_query_cache, run_queries
+from etl_pipe import upsert_data
+
+
+def test_cached_results_outlive_the_process(warehouse, monkeypatch):
+    upsert_data(warehouse, str(DATA_DIR / 'new_users.csv'), mode='bulk')
+    queries = {'customers': "SELECT COUNT(*) AS customers FROM customer_enriched"}
+    first = run_queries(queries)
+
+    # A new process starts with an empty in-memory cache
+    with connection_manager._query_cache_lock:
+        connection_manager._query_cache.clear()
+    executed = []
+    fetch_rows = connection_manager._fetch
+
+    def counted_fetch(sql, *args):
+        executed.append(sql)
+        return fetch_rows(sql, *args)
+
+    monkeypatch.setattr(connection_manager, '_fetch', counted_fetch)
+    second = run_queries(queries)
+    assert executed == [connection_manager.DATA_VERSION_SQL]
+    assert second['customers'][0].customers == first['customers'][0].customers == 6
+    assert second['customers'][0].cursor_description[0][0] == 'customers'
+
+    clear_query_cache()
+    run_queries(queries)
+    assert executed[-1] == queries['customers']
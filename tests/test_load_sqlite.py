@@ -0,0 +1,153 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from conftest import DATA_DIR
+from etl_pipe import (SQLITE_ANALYZED_ROWS_SQL, DatabaseLoader, collapse_duplicates, ingest_directory, load_csv,
+                      prepare_data, resume_batch, upsert_data)
+
+NEW_USERS = DATA_DIR / 'new_users.csv'
+UPDATE_USERS = DATA_DIR / 'update_users.csv'
+SUMMARY_SQL = "SELECT dimension, key1, key2, customer_count FROM customer_summary ORDER BY 1, 2, 3"
+
+
+def prepared(path):
+    return prepare_data(load_csv(str(path)))
+
+
+def assert_summary_matches_rebuild(warehouse, fetch):
+    maintained = fetch(SUMMARY_SQL)
+    assert maintained
+    assert DatabaseLoader(warehouse).rebuild_summary()
+    assert fetch(SUMMARY_SQL) == maintained
+
+
+@pytest.mark.parametrize('mode', ['row', 'bulk', 'merge'])
+def test_load_and_update(warehouse, fetch, mode):
+    results = DatabaseLoader(warehouse).load_data(prepared(NEW_USERS), mode=mode)
+    assert results['errors'] == []
+    assert results['successful_inserts'] == 6
+
+    updates = prepared(UPDATE_USERS)
+    results = DatabaseLoader(warehouse).load_data(updates, mode=mode)
+    assert results['errors'] == []
+    assert results['successful_inserts'] + results['successful_updates'] + results['unchanged_records'] == len(updates)
+    assert fetch("SELECT email FROM customer_enriched WHERE customer_id = 1001") == [('john.smith@newemail.com',)]
+    assert fetch("SELECT COUNT(*) FROM enrichment_audit") == [(2,)]
+    assert_summary_matches_rebuild(warehouse, fetch)
+
+
+@pytest.mark.parametrize('mode', ['bulk', 'merge'])
+def test_failing_rows_are_bisected_into_load_rejects(warehouse, fetch, mode):
+    df = prepared(NEW_USERS)
+    # Past the schema check, so only the database rejects it (NOT NULL)
+    df.loc[df['customer_id'] == 1003, 'first_name'] = None
+    results = DatabaseLoader(warehouse, chunk_size=4).load_data(df, mode=mode)
+    assert results['failed_records'] == 1
+    assert results['successful_inserts'] == 5
+    assert fetch("SELECT customer_id FROM load_rejects") == [(1003,)]
+    assert fetch("SELECT COUNT(*) FROM customer_enriched WHERE customer_id = 1003") == [(0,)]
+    assert_summary_matches_rebuild(warehouse, fetch)
+
+
+def test_parallel_workers_keep_summary_in_step(warehouse, fetch):
+    results = DatabaseLoader(warehouse, chunk_size=2).load_data(prepared(NEW_USERS), mode='bulk', workers=3)
+    assert results['errors'] == []
+    assert fetch("SELECT COUNT(*) FROM customer_enriched") == [(6,)]
+    assert_summary_matches_rebuild(warehouse, fetch)
+
+
+def duplicated_frame():
+    df = prepared(NEW_USERS).head(3).copy()
+    repeat = df.iloc[[0]].copy()
+    repeat['email'] = 'older@email.com'
+    repeat['source_processed_date'] = df['source_processed_date'].iloc[0] - pd.Timedelta(days=1)
+    # The repeat comes last in the file but carries the older processed_date
+    return pd.concat([df, repeat], ignore_index=True)
+
+
+@pytest.mark.parametrize('policy, email, rejected', [
+    ('last', 'older@email.com', 0),
+    ('processed_date', 'john@email.com', 0),
+    ('reject', None, 2),
+])
+def test_dedup_policies(warehouse, fetch, policy, email, rejected):
+    df = duplicated_frame()
+    kept, dropped = collapse_duplicates(df, policy)
+    assert len(kept) == (2 if policy == 'reject' else 3)
+
+    results = DatabaseLoader(warehouse, dedup=policy).load_data(df, mode='bulk')
+    assert results['failed_records'] == rejected
+    assert results['collapsed_records'] == (0 if policy == 'reject' else 1)
+    stored = fetch("SELECT email FROM customer_enriched WHERE customer_id = 1001")
+    assert stored == ([(email,)] if email else [])
+    assert fetch("SELECT COUNT(*) FROM load_rejects") == [(rejected,)]
+
+
+def test_resume_batch_finishes_an_interrupted_load(warehouse, fetch, monkeypatch):
+    load_frame = DatabaseLoader._load_frame
+    calls = []
+
+    def fail_second_frame(self, *args, **kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError('connection lost')
+        return load_frame(self, *args, **kwargs)
+
+    monkeypatch.setattr(DatabaseLoader, '_load_frame', fail_second_frame)
+    results = upsert_data(warehouse, str(NEW_USERS), mode='bulk', commit_every=2)
+    assert not results['success']
+    assert fetch("SELECT rows_committed, status FROM load_checkpoint") == [(2, 'RUNNING')]
+    assert fetch("SELECT COUNT(*) FROM customer_enriched") == [(2,)]
+    # Timings of the failed load are kept without an audit row
+    assert fetch("SELECT COUNT(*) FROM enrichment_audit") == [(0,)]
+    assert fetch("SELECT COUNT(*) FROM load_stage_metrics") != [(0,)]
+
+    monkeypatch.setattr(DatabaseLoader, '_load_frame', load_frame)
+    results = resume_batch(warehouse, results['batch_id'], commit_every=2)
+    assert results['success']
+    assert results['successful_inserts'] == 6
+    assert fetch("SELECT rows_committed, status FROM load_checkpoint") == [(6, 'COMPLETE')]
+    assert fetch("SELECT COUNT(*) FROM customer_enriched") == [(6,)]
+    assert_summary_matches_rebuild(warehouse, fetch)
+
+
+def test_ingest_applies_in_name_order_and_stops_at_a_bad_file(warehouse, fetch, tmp_path):
+    drop = tmp_path / 'drop'
+    drop.mkdir()
+    (drop / 'customers_3.csv').write_text(UPDATE_USERS.read_text())
+    (drop / 'customers_2.csv').write_text('customer_id,first_name\n"unterminated\n')
+    (drop / 'customers_1.csv').write_text(NEW_USERS.read_text())
+
+    summary = ingest_directory(warehouse, str(drop / '*.csv'), mode='bulk', parse_workers=1)
+    assert not summary['success']
+    assert [Path(results['file']).name for results in summary['files']] == ['customers_1.csv', 'customers_2.csv']
+    # customers_3 must not overtake the file that failed
+    assert fetch("SELECT email FROM customer_enriched WHERE customer_id = 1001") == [('john@email.com',)]
+
+
+def test_statistics_refresh_once_the_table_doubles(warehouse, fetch):
+    df = prepared(NEW_USERS)
+    DatabaseLoader(warehouse).load_data(df.head(2), mode='bulk')
+    assert fetch("SELECT rows_inserted FROM statistics_pending") == [(0,)]
+    assert fetch(SQLITE_ANALYZED_ROWS_SQL) == [(2,)]
+
+    DatabaseLoader(warehouse).load_data(df.iloc[2:4], mode='bulk')
+    # 2 new rows against 2 analyzed: not yet doubled
+    assert fetch("SELECT rows_inserted FROM statistics_pending") == [(2,)]
+    assert fetch(SQLITE_ANALYZED_ROWS_SQL) == [(2,)]
+
+    DatabaseLoader(warehouse).load_data(df.iloc[4:], mode='bulk')
+    assert fetch("SELECT rows_inserted FROM statistics_pending") == [(0,)]
+    assert fetch(SQLITE_ANALYZED_ROWS_SQL) == [(6,)]
+
+
+def test_loads_checkpoint_by_default(warehouse, fetch):
+    results = upsert_data(warehouse, str(NEW_USERS), mode='bulk')
+    assert results['success']
+    assert fetch("SELECT rows_committed, status FROM load_checkpoint") == [(6, 'COMPLETE')]
+
+    results = upsert_data(warehouse, str(UPDATE_USERS), mode='bulk', commit_every=0)
+    assert results['success']
+    assert fetch("SELECT COUNT(*) FROM load_checkpoint") == [(1,)]
@@ -0,0 +1,100 @@
+import sqlite3
+
+import pytest
+
+import sqlite_backend
+from sqlite_backend import translate
+
+
+@pytest.fixture
+def db():
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE t (region TEXT, risk TEXT, score INTEGER, started TEXT, ended TEXT)")
+    conn.executemany("INSERT INTO t VALUES (?, ?, ?, ?, ?)", [
+        ('London', 'High', 90, '2024-01-01 10:00:00', '2024-01-01 10:01:30'),
+        ('London', 'Low', 10, '2024-01-01 10:00:00', '2024-01-01 12:00:00'),
+        ('Wales', 'High', 80, '2024-01-01 10:00:00', '2024-01-02 10:00:00'),
+    ])
+    yield conn
+    conn.close()
+
+
+def run(db, sql):
+    *setup, last = translate(sql)
+    for statement in setup:
+        db.execute(statement)
+    return db.execute(last).fetchall()
+
+
+def test_top_becomes_limit(db):
+    assert run(db, "SELECT TOP 2 score FROM t ORDER BY score DESC") == [(90,), (80,)]
+
+
+def test_top_in_subquery_limits_the_subquery(db):
+    sql = """
+    SELECT region, score FROM t
+    WHERE score IN (SELECT TOP 1 score FROM t ORDER BY score DESC)
+    ORDER BY score
+    """
+    assert run(db, sql) == [('London', 90)]
+
+
+def test_datediff_units(db):
+    sql = """
+    SELECT DATEDIFF(SECOND, started, ended), DATEDIFF(MINUTE, started, ended),
+           DATEDIFF(HOUR, started, ended), DATEDIFF(DAY, started, ended)
+    FROM t ORDER BY score
+    """
+    assert run(db, sql) == [(7200, 120, 2, 0), (86400, 1440, 24, 1), (90, 1, 0, 0)]
+
+
+def test_decimal_cast_rounds(db):
+    assert run(db, "SELECT CAST(2 * 100.0 / 3 AS DECIMAL(5,1))") == [(66.7,)]
+    assert run(db, "SELECT CAST(score AS TEXT) FROM t WHERE score = 10") == [('10',)]
+
+
+def test_getdate(db):
+    (value,), = run(db, "SELECT GETDATE()")
+    assert len(value) == 19 and value[4] == '-'
+
+
+def test_grouping_sets(db):
+    sql = """
+    SELECT risk, region, COUNT(*) as n, GROUPING(risk) as risk_rolled_up, GROUPING(region) as region_rolled_up
+    FROM t
+    GROUP BY GROUPING SETS ((risk), (region), ())
+    """
+    assert sorted(run(db, sql), key=repr) == sorted([
+        ('High', None, 2, 0, 1),
+        ('Low', None, 1, 0, 1),
+        (None, 'London', 2, 1, 0),
+        (None, 'Wales', 1, 1, 0),
+        (None, None, 3, 1, 1),
+    ], key=repr)
+
+
+def test_savepoints(db):
+    db.isolation_level = None
+    db.execute("BEGIN")
+    run(db, "SAVE TRANSACTION batch")
+    db.execute("DELETE FROM t")
+    run(db, "IF @@TRANCOUNT > 0 ROLLBACK TRANSACTION batch")
+    db.execute("COMMIT")
+    assert run(db, "SELECT COUNT(*) FROM t") == [(3,)]
+
+
+def test_registered_statements_run_in_order(monkeypatch):
+    monkeypatch.setattr(sqlite_backend, '_statements', {})
+    sqlite_backend.register_statements("MERGE something", "SELECT 1", "SELECT 2")
+    assert translate("MERGE something") == ("SELECT 1", "SELECT 2")
+
+
+def test_rows_behave_like_pyodbc_rows(tmp_path):
+    conn = sqlite_backend.connect(f"sqlite:///{tmp_path / 'rows.db'}")
+    cursor = conn.cursor()
+    cursor.execute("SELECT ? AS count, ? AS index_name", 5, 'x')
+    row = cursor.fetchone()
+    # count is a column here, not tuple.count
+    assert row.count == 5 and row.index_name == 'x' and row[0] == 5
+    assert [column[0] for column in row.cursor_description] == ['count', 'index_name']
+    conn.close()